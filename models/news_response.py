@@ -0,0 +1,36 @@
+# models/news_response.py
+# Wire schemas for the NewsAPI /v2/everything and NewsData /api/1/news responses.
+# Decoded straight from the response bytes with msgspec, then mapped onto Headline
+# objects by the clients in services/news_aggregator.py.
+# Only the fields a Headline needs are materialised; content, authors, images and the
+# other per-article keys are skipped while decoding instead of becoming throwaway dicts.
+from typing import Optional, List
+import msgspec
+
+
+class NewsApiArticle(msgspec.Struct, gc=False):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    url: Optional[str] = None
+    publishedAt: Optional[str] = None
+
+
+class NewsApiResponse(msgspec.Struct, gc=False):
+    articles: Optional[List[NewsApiArticle]] = None
+
+
+class NewsDataArticle(msgspec.Struct, gc=False):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    link: Optional[str] = None
+    pubDate: Optional[str] = None
+    date: Optional[str] = None
+
+
+class NewsDataResponse(msgspec.Struct, gc=False):
+    results: Optional[List[NewsDataArticle]] = None
+
+
+# Decoders are reusable and thread-safe; build once per process
+newsapi_decoder = msgspec.json.Decoder(NewsApiResponse)
+newsdata_decoder = msgspec.json.Decoder(NewsDataResponse)
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional, Dict
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class OptionGreeks:
     rho: Optional[float] = None
     vega: Optional[float] = None
@@ -12,12 +12,12 @@ class OptionGreeks:
     iv: Optional[float] = None
     currentValue: Optional[bool] = None
 
-@dataclass
+@dataclass(slots=True)
 class ProductId:
     symbol: str
     typeCode: str
 
-@dataclass
+@dataclass(slots=True)
 class Product:
     symbol: str
     securityType: str
@@ -28,7 +28,7 @@ class Product:
     strikePrice: Optional[float] = None
     productId: Optional[ProductId] = None
 
-@dataclass
+@dataclass(slots=True)
 class Quick:
     lastTrade: Optional[float] = None
     lastTradeTime: Optional[int] = None
@@ -37,7 +37,7 @@ class Quick:
     volume: Optional[int] = None
     quoteStatus: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class OptionContract:
     symbol: str
     optionType: str
@@ -0,0 +1,81 @@
+# models/option_chain.py
+# Wire schema for the E*TRADE optionchains.json response.
+# Decoded straight from the response bytes with msgspec, then mapped onto the
+# OptionContract dataclasses in models/option.py by EtradeConsumer.
+# Only the declared fields are materialised (Put legs, unused keys are skipped while
+# decoding), and the structs hold no reference cycles, so they opt out of GC tracking.
+from typing import Optional, List
+import msgspec
+
+
+class ChainGreeks(msgspec.Struct, gc=False):
+    rho: Optional[float] = None
+    vega: Optional[float] = None
+    theta: Optional[float] = None
+    delta: Optional[float] = None
+    gamma: Optional[float] = None
+    iv: Optional[float] = None
+    currentValue: Optional[bool] = None
+
+
+class ChainCall(msgspec.Struct, gc=False):
+    symbol: str
+    optionType: str
+    strikePrice: float
+    displaySymbol: str
+    osiKey: str
+    bid: Optional[float] = None
+    ask: Optional[float] = None
+    bidSize: Optional[int] = None
+    askSize: Optional[int] = None
+    inTheMoney: Optional[str] = None
+    volume: Optional[int] = None
+    openInterest: Optional[int] = None
+    netChange: Optional[float] = None
+    lastPrice: Optional[float] = None
+    quoteDetail: Optional[str] = None
+    optionCategory: Optional[str] = None
+    timeStamp: Optional[int] = None
+    adjustedFlag: Optional[bool] = None
+    OptionGreeks: Optional[ChainGreeks] = None
+
+
+class ChainOptionPair(msgspec.Struct, gc=False):
+    Call: Optional[ChainCall] = None
+
+
+class ChainExpiry(msgspec.Struct, gc=False):
+    year: int = 1970
+    month: int = 1
+    day: int = 1
+
+
+class ChainResponse(msgspec.Struct, gc=False):
+    nearPrice: Optional[float] = None
+    SelectedED: ChainExpiry = msgspec.field(default_factory=ChainExpiry)
+    OptionPair: List[ChainOptionPair] = msgspec.field(default_factory=list)
+
+
+class ChainEnvelope(msgspec.Struct, gc=False):
+    OptionChainResponse: ChainResponse = msgspec.field(default_factory=ChainResponse)
+
+
+# optionexpiredate.json: only the date parts and type are read
+class ExpiryDate(msgspec.Struct, gc=False):
+    year: Optional[int] = None
+    month: Optional[int] = None
+    day: Optional[int] = None
+    expiryType: Optional[str] = None
+
+
+class ExpiryResponse(msgspec.Struct, gc=False):
+    ExpirationDate: List[ExpiryDate] = msgspec.field(default_factory=list)
+
+
+class ExpiryEnvelope(msgspec.Struct, gc=False):
+    OptionExpireDateResponse: ExpiryResponse = msgspec.field(default_factory=ExpiryResponse)
+
+
+# Decoders are reusable and thread-safe; build once per process
+chain_decoder = msgspec.json.Decoder(ChainEnvelope)
+expiry_decoder = msgspec.json.Decoder(ExpiryEnvelope)
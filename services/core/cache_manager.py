@@ -1,14 +1,22 @@
 # services/core/cache_manager.py
-import json
+import orjson
 import os
-import tempfile
+import time
 from datetime import datetime, timedelta, timezone
-from threading import RLock
+from threading import Lock, RLock
 from services.core.shutdown_handler import ShutdownManager
+from services.core.token_bucket import TokenBucket
 from services.logging.logger_singleton import getLogger
 import shutil
 from pathlib import Path
 
+def _json_default(o):
+    # orjson passes float subclasses it doesn't know to default; keep them numeric like json.dumps did
+    if isinstance(o, float):
+        return float(o)
+    return str(o)
+
+
 class CacheManager:
     
     """
@@ -21,16 +29,26 @@ class CacheManager:
                  ttl_days: float = None,
                  ttl_hours: float = None,
                  ttl_minutes: float = None,
-                 autosave_interval: int = 60):
+                 autosave_interval: int = 60,
+                 fsync_on_save: bool = False):
         self._cache = {}
         self._lock = RLock()
+        self._save_lock = Lock()  # the temp file path is per process, so writers take turns
+        self._dirty = False  # set on mutation, cleared once the cache is persisted
 
         self.name = name
         self.filepath = filepath
         self.ttl_days = ttl_days
         self.ttl_hours = ttl_hours
         self.ttl_minutes = ttl_minutes
+
+        days, hours, minutes = ttl_days or 0, ttl_hours or 0, ttl_minutes or 0
+        if days == 0 and hours == 0 and minutes == 0:
+            days = 30  # default 30 days
+        self._ttl = timedelta(days=days, hours=hours, minutes=minutes)
+        self._ttl_seconds = self._ttl.total_seconds()
         self.autosave_interval = autosave_interval
+        self.fsync_on_save = fsync_on_save  # only worth the disk round-trip for caches we can't rebuild
         self.logger = getLogger()
         
         
@@ -60,103 +78,152 @@ class CacheManager:
     # Cache Persistence
     # ----------------------------
     def _load_cache(self):
-        if not os.path.exists(self.filepath):
+        try:
+            with open(self.filepath, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            # Start empty; the first autosave writes the file
             os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
-            with open(self.filepath, "w") as f:
-                json.dump({}, f)
+            with self._lock:
+                self._dirty = True
             return
 
         try:
-            with open(self.filepath, "r") as f:
-                raw = json.load(f)
+            raw = orjson.loads(data)
+            # Filter expired/undated entries in one pass before taking the lock
+            cutoff = time.time() - self._ttl_seconds
+            parse = self._parse_timestamp
+            filtered = {
+                key: (data.get("Value"), ts)
+                for key, data in raw.items()
+                if (ts := parse(data.get("Timestamp"))) is not None and ts >= cutoff
+            }
+            # Merge rather than replace: this also runs mid-session (ticker refresh, manual reload),
+            # and entries added since the last autosave must survive it
             with self._lock:
-                for key, data in raw.items():
-                    ts_str = data.get("Timestamp")
-                    value = data.get("Value")
-                    if ts_str is None:
-                        continue
-                    ts = datetime.fromisoformat(ts_str)
-                    if not self.is_expired(ts):
-                        self._cache[key] = {"Value": value, "Timestamp": ts}
-        except json.JSONDecodeError:
+                self._cache.update(filtered)
+        except orjson.JSONDecodeError:
             self.logger.logMessage(f"[{self.name}] Cache file empty or corrupted, starting fresh")
         except Exception as e:
             self.logger.logMessage(f"[{self.name}] Failed to load cache: {e}")
             
     def _save_cache(self):
         try:
-            # Copy under lock
+            # Copy under lock; skip the write entirely if nothing changed since the last save
             with self._lock:
+                if not self._dirty:
+                    return
                 cache_copy = dict(self._cache)
+                self._dirty = False
 
+            # Timestamps live in memory as epoch seconds but stay ISO-8601 (local offset) on disk,
+            # which is what the analytics readers and backups expect; orjson encodes the datetimes
+            local_tz = datetime.now().astimezone().tzinfo
             serializable = {
-                k: {"Value": v["Value"], "Timestamp": v["Timestamp"].isoformat()}
-                for k, v in cache_copy.items()
+                k: {"Value": value, "Timestamp": datetime.fromtimestamp(ts, local_tz)}
+                for k, (value, ts) in cache_copy.items()
             }
-
-            dir_name = os.path.dirname(self.filepath)
-            with tempfile.NamedTemporaryFile("w", dir=dir_name, delete=False, encoding="utf-8") as tmp:
-                json.dump(serializable, tmp, indent=2, default=str)
-                tmp.flush()
-                os.fsync(tmp.fileno())
-
-            os.replace(tmp.name, self.filepath)
+            payload = orjson.dumps(
+                serializable,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2,
+                default=_json_default,
+            )
+
+            tmp_path = f"{self.filepath}.tmp.{os.getpid()}"
+            with self._save_lock:
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                try:
+                    os.write(fd, payload)
+                    if self.fsync_on_save:
+                        os.fsync(fd)
+                finally:
+                    os.close(fd)
+                os.replace(tmp_path, self.filepath)
         except Exception as e:
+            with self._lock:
+                self._dirty = True
             self.logger.logMessage(f"[{self.name}] Failed to save cache: {e}")
 
 
     def autosave_loop(self, stop_event):
         while not stop_event.is_set():
+            self._sweep_expired()
             self._save_cache()
             stop_event.wait(self.autosave_interval)
 
     # ----------------------------
     # TTL / Expiration
     # ----------------------------
-    def is_expired(self, timestamp):
-        days = self.ttl_days if self.ttl_days is not None else 0
-        hours = self.ttl_hours if self.ttl_hours is not None else 0
-        minutes = self.ttl_minutes if self.ttl_minutes is not None else 0
-
-        if days == 0 and hours == 0 and minutes == 0:
-            days = 30  # default 30 days
+    def is_expired(self, timestamp: float):
+        return time.time() - timestamp > self._ttl_seconds
 
-        ttl = timedelta(days=days, hours=hours, minutes=minutes)
-        return datetime.now().astimezone() - timestamp > ttl
+    def _sweep_expired(self):
+        """Drop every expired entry in one pass; run periodically from the autosave thread."""
+        cutoff = time.time() - self._ttl_seconds
+        with self._lock:
+            expired = [k for k, (_, ts) in self._cache.items() if ts < cutoff]
+            for key in expired:
+                del self._cache[key]
+            if expired:
+                self._dirty = True
+
+    @staticmethod
+    def _parse_timestamp(raw):
+        """Accept epoch seconds or the ISO-8601 strings written to disk."""
+        if raw is None:
+            return None
+        if isinstance(raw, (int, float)):
+            return float(raw)
+        return datetime.fromisoformat(raw).timestamp()
 
     # ----------------------------
     # Public Cache Methods
     # ----------------------------
     def add(self, key, value):
         with self._lock:
-            self._cache[key] = {
-                "Value": self._convert_nested_tuples(value),
-                "Timestamp": datetime.now().astimezone()
-            }
+            # Entries are (value, epoch_seconds) tuples
+            self._cache[key] = (self.maybe_convert_tuples(value), time.time())
+            self._dirty = True
+
+    def bulk_add(self, items):
+        """Add (key, value) pairs under a single lock acquisition, all stamped with the same time."""
+        now = time.time()
+        convert = self.maybe_convert_tuples
+        with self._lock:
+            for key, value in items:
+                self._cache[key] = (convert(value), now)
+            self._dirty = True
 
     def get(self, key):
-        if self.is_cached(key):
-            return self._cache[key]["Value"]
-        return None
+        # Reads are lock-free: a single dict.get is atomic under the GIL, so concurrent
+        # scanner threads only contend on the lock when writing or sweeping.
+        item = self._cache.get(key)
+        if item is None:
+            return None
+        if self.is_expired(item[1]):
+            return None
+        return item[0]
 
     def is_cached(self, key):
-        with self._lock:
-            item = self._cache.get(key)
-            if item:
-                if self.is_expired(item["Timestamp"]):
-                    del self._cache[key]
-                    return False
-                return True
+        item = self._cache.get(key)
+        if item is None:
             return False
+        return not self.is_expired(item[1])
 
     def clear(self):
         with self._lock:
             self._cache.clear()
+            self._dirty = True
         self._save_cache()
 
     def is_empty(self):
         return not bool(self._cache)
 
+    def valid_keys(self) -> set:
+        """Snapshot of keys whose entries have not expired."""
+        with self._lock:
+            return {k for k, item in self._cache.items() if not self.is_expired(item[1])}
+
     # ----------------------------
     # Utility Methods
     # ----------------------------
@@ -175,9 +242,10 @@ class CacheManager:
         return nested
 
     def maybe_convert_tuples(self, value):
-        if isinstance(value, dict) and any(isinstance(k, tuple) for k in value.keys()):
-            return self._convert_nested_tuples(value)
-        return value
+        # Only allocate the nested form when a tuple key is actually present
+        if not isinstance(value, dict) or next((k for k in value if isinstance(k, tuple)), None) is None:
+            return value
+        return self._convert_nested_tuples(value)
     
     
     def copy_cache_to_file(self, backup_folder: str = "data/ticker_eval",filename: str = ""):
@@ -198,6 +266,9 @@ class CacheManager:
         dst = backup_dir / f"{filename}"
 
         try:
+            # Flush pending changes first: the file only exists after the first save, and the
+            # backup should match what is in memory rather than the last autosave
+            self._save_cache()
             shutil.copy2(src, dst)
             self.logger.logMessage(f"[{self.name} Backup] Saved backup to {dst}")
         except Exception as e:
@@ -214,7 +285,7 @@ class IgnoreTickerCache(CacheManager):
 
 class BoughtTickerCache(CacheManager):
     def __init__(self):
-        super().__init__("BoughtTicker Cache", "cache/bought_tickers.json", ttl_days=30, autosave_interval=60)
+        super().__init__("BoughtTicker Cache", "cache/bought_tickers.json", ttl_days=30, autosave_interval=60, fsync_on_save=True)
 
 
 class NewsApiCache(CacheManager):
@@ -227,8 +298,20 @@ class HeadlineCache(CacheManager):
 
 
 class RateLimitCache(CacheManager):
+    # Steady request rates per upstream; the cache entries still record reactive cooldowns
+    BUCKET_RPM = {"YFinance": 90}  # Yahoo starts returning 429s around 100/min
+
     def __init__(self):
         super().__init__("RateLimit Cache", "cache/ratelimit_sentiment.json", ttl_days=1, autosave_interval=60)
+        self._buckets = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        """Process-wide token bucket for `key`, sized so every scanner worker can have one request in flight."""
+        with self._lock:
+            b = self._buckets.get(key)
+            if b is None:
+                b = self._buckets[key] = TokenBucket(self.BUCKET_RPM.get(key, 60), self.scanner_config["max_workers"])
+            return b
 
 class YFinanceTickerCache(CacheManager):
     def __init__(self):
@@ -288,18 +371,18 @@ class Caches:
             self.headlines
         ]
 
+    # Single writer thread for every cache; clean caches are skipped by _save_cache
+    def autosave_all(self, stop_event, interval: int = 60):
+        while not stop_event.is_set():
+            for cache in self.all_caches():
+                cache._sweep_expired()
+                cache._save_cache()
+            stop_event.wait(interval)
+
     # Return tuples for autosave loops (for ThreadManager)
     def all_autosave_loops(self):
         return [
-            (self.ignore.autosave_loop, "Ignore Cache Autosave"),
-            (self.bought.autosave_loop, "Bought Cache Autosave"),
-            (self.news.autosave_loop, "NewsAPI Cache Autosave"),
-            (self.rate.autosave_loop, "RateLimit Cache Autosave"),
-            (self.last_seen.autosave_loop, "Last Ticker Cache Autosave"),
-            (self.ticker_metadata.autosave_loop,"Ticker Metadata Cache Autosave"),
-            (self.eval.autosave_loop,"Evaluation Cache Autosave"),
-            (self.yfin.autosave_loop, "YFinance Cache Autosave"),
-            (self.headlines.autosave_loop, "Headline Cache Autosave")
+            (self.autosave_all, "Unified Cache Autosave")
         ]
 
     # Clear all caches
@@ -31,6 +31,15 @@ class ShutdownManager:
         cls._callbacks.append(callback)
         cls.log(f"[ShutdownManager] Callback registered: {name}")
 
+    @classmethod
+    def unregister(cls, name: str, callback: Callable[[str], None]):
+        """Remove a callback added by register(); a no-op if it is not registered."""
+        try:
+            cls._callbacks.remove(callback)
+        except ValueError:
+            return
+        cls.log(f"[ShutdownManager] Callback unregistered: {name}")
+
     @classmethod
     def stop_all(cls, reason="Manual shutdown"):
         if cls._stop_event:
@@ -38,7 +47,7 @@ class ShutdownManager:
         cls.log(f"[ShutdownManager] stop_all triggered: {reason}")
 
         # Execute registered callbacks
-        for cb in cls._callbacks:
+        for cb in list(cls._callbacks):  # callbacks may unregister themselves
             try:
                 cb(reason)
             except Exception as e:
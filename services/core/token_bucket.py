@@ -0,0 +1,40 @@
+# services/core/token_bucket.py
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Pre-emptive request limiter shared by every thread calling one upstream.
+    Tokens refill continuously at rpm/60 per second up to `capacity`; acquire() blocks
+    until enough are available, so callers pace themselves below the limit instead of
+    waiting for a 429 and backing off.
+    """
+
+    def __init__(self, rpm: float, capacity: int = 1):
+        self._rate = rpm / 60.0
+        self._capacity = max(1, capacity)
+        self._tokens = float(self._capacity)
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self._capacity, self._tokens + (now - self._last_update) * self._rate)
+        self._last_update = now
+
+    def acquire(self, cost: float = 1.0):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                wait = (cost - self._tokens) / self._rate
+            time.sleep(wait)
+
+    def drain(self):
+        """Empty the bucket after the upstream pushed back, so every caller waits for a fresh refill."""
+        with self._lock:
+            self._tokens = 0.0
+            self._last_update = time.monotonic()
@@ -0,0 +1,32 @@
+# services/core/ttl_memo.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class TtlMemo:
+    """Bounded in-memory memo; entries expire ttl seconds after they are stored."""
+
+    def __init__(self, ttl, maxsize):
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return None
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
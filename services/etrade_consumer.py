@@ -1,15 +1,27 @@
 # etrade_consumer.py
 import os
-import json
-from typing import List
+import orjson
+import functools
+from pathlib import Path
+from types import MappingProxyType
+from typing import ClassVar, List, Mapping
 import time as pyTime
+import threading
+import weakref
+from collections import deque
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from cryptography.fernet import Fernet
 from requests_oauthlib import OAuth1Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urlencode
-from models.generated.Account import Account, PortfolioAccount
+from models.generated.Account import Account
 from models.generated.Position import Position
 from models.option import OptionContract,Product,Quick,OptionGreeks,ProductId
+from models.option_chain import chain_decoder, expiry_decoder
+from services.core.shutdown_handler import ShutdownManager
+from services.core.ttl_memo import TtlMemo
 from services.threading.api_worker import ApiWorker,HttpMethod
 from services.logging.logger_singleton import getLogger
 from services.token_status import TokenStatus
@@ -17,6 +29,37 @@ from services.utils import write_scratch
 import enum
 
 TOKEN_LIFETIME_DAYS = 90
+SESSION_VALID_TTL = 110 * 60  # seconds a successful probe is trusted; inside E*TRADE's 2h idle window
+ACCOUNTS_TTL = 3600  # seconds the parsed account list is reused; account keys change at most daily
+QUOTE_BATCH_SIZE = 25  # symbols per multi-symbol quote request (E*TRADE's limit)
+OPTION_CHAIN_PREFETCH = 4  # expiries fetched ahead while the current one is parsed
+MARKET_DATA_TTL = 5  # seconds a quote/chain is reused for repeat lookups of the same symbol
+MARKET_DATA_MAXSIZE = 2048  # symbols kept per memo; oldest are dropped first
+INVALID_SYMBOL_TTL = 6 * 3600  # seconds a 10033 rejection is trusted before the symbol is retried
+
+
+def _json(r):
+    """Parse a response body (or raw bytes/str) with orjson; same dict tree as r.json()."""
+    return orjson.loads(r.content if hasattr(r, "content") else r)
+
+
+@functools.lru_cache(maxsize=1)
+def _fernet():
+    """Fernet for the local secret key, shared by both environments."""
+    # Deferred: loading the OpenSSL bindings is the slowest part of importing this module
+    from cryptography.fernet import Fernet
+
+    return Fernet(Path("encryption/secret.key").read_bytes())
+
+
+@functools.lru_cache(maxsize=2)
+def _load_keysecret(sandbox: bool) -> tuple:
+    """Decrypted consumer key/secret per environment; the encryption files don't change at runtime."""
+    f = _fernet()
+    sandbox_suffix = "sandbox" if sandbox else "prod"
+    encrypted_key = Path(f"encryption/etrade_consumer_key_{sandbox_suffix}.enc").read_bytes()
+    encrypted_secret = Path(f"encryption/etrade_consumer_secret_{sandbox_suffix}.enc").read_bytes()
+    return f.decrypt(encrypted_key).decode(), f.decrypt(encrypted_secret).decode()
 
 class ActionResponse(enum.Enum):
     SUCCESS = "SUCCESS"
@@ -42,23 +85,71 @@ class InvalidSymbolError(Exception):
     pass
 
 
+# One C-level fetch of the chain struct fields, in OptionContract / OptionGreeks positional order
+_CALL_FIELDS = attrgetter(
+    "symbol", "optionType", "strikePrice", "displaySymbol", "osiKey",
+    "bid", "ask", "bidSize", "askSize", "inTheMoney", "volume",
+    "openInterest", "netChange", "lastPrice", "quoteDetail",
+    "optionCategory", "timeStamp", "adjustedFlag",
+)
+_GREEK_FIELDS = attrgetter("rho", "vega", "theta", "delta", "gamma", "iv", "currentValue")
+
+
+# E*TRADE error codes seen on 400 responses -> exception raised to the scanner
+_ERROR_CODE_EXCEPTIONS = {
+    10033: InvalidSymbolError,
+    10031: NoOptionsError,
+    10032: NoOptionsError,
+}
+
+
 class EtradeConsumer:
+    # Static option-chain query params; only the symbol and expiry vary per request
+    _CHAIN_PARAMS: ClassVar[Mapping[str, str]] = MappingProxyType({
+        "includeWeekly": "true",
+        "strategy": "SINGLE",
+        "skipAdjusted": "false",
+        "chainType": "CALL",
+    })
+    # Shared by every consumer in the process, keyed by token file (one per environment).
+    # A 401 from a real call drops both, so the next load re-reads the file and re-probes.
+    _token_cache: ClassVar[dict] = {}
+    _session_valid_until: ClassVar[dict] = {}  # monotonic deadline of the last successful probe
+    # Symbols E*TRADE reported as invalid (10033); expires so listing changes and one-off rejections recover
+    _invalid_symbols: ClassVar[TtlMemo] = TtlMemo(INVALID_SYMBOL_TTL, MARKET_DATA_MAXSIZE)
+
     def __init__(self, apiWorker: ApiWorker = None, sandbox=False, debug=False):
         self.debug = debug
         self.sandbox = sandbox
         self.apiWorker = apiWorker
         self.token_status = TokenStatus()
         self.logger = getLogger()
+        self._accounts = None
+        self._accounts_valid_until = 0.0
+        self._quote_memo = TtlMemo(MARKET_DATA_TTL, MARKET_DATA_MAXSIZE)
+        self._chain_memo = TtlMemo(MARKET_DATA_TTL, MARKET_DATA_MAXSIZE)
+        self._prefetch_pool = None  # created on the first chain lookup, shut down by close()
+        self._prefetch_shutdown = None  # ShutdownManager callback, registered while the pool exists
+        self._prefetch_lock = threading.Lock()
         envType = "nonProd" if sandbox else "prod"
 
-        self.consumer_key, self.consumer_secret = self.load_encrypted_etrade_keysecret(sandbox)
+        self.consumer_key, self.consumer_secret = _load_keysecret(bool(sandbox))
         self.token_file = os.path.join("encryption", f"etrade_tokens_{envType}.json")
         self.base_url = "https://apisb.etrade.com" if sandbox else "https://api.etrade.com"
+        self._accounts_url = f"{self.base_url}/v1/accounts/list.json"
+        self._expiry_url = f"{self.base_url}/v1/market/optionexpiredate.json"
+        self._chain_url = f"{self.base_url}/v1/market/optionchains.json"
+        self._quote_url_fmt = self.base_url + "/v1/market/quote/{symbol}.json"
+        self._portfolio_url_fmt = self.base_url + "/v1/accounts/{key}/portfolio.json"
+        # One connection pool per consumer, shared by the API session and the OAuth token flow.
+        # Only retry failed connects: a re-sent read would replay the signed OAuth nonce
+        self._adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(total=2, read=0, backoff_factor=0.2))
 
         if not self.consumer_key:
             raise Exception("Missing E*TRADE consumer key")
 
-        if not os.path.exists(self.token_file):
+        token_data = self._read_token_file()
+        if token_data is None:
             self.logger.logMessage("No token file found. Starting OAuth...")
             while True:
                 generate_status = self.generate_token()
@@ -69,16 +160,39 @@ class EtradeConsumer:
                 elif generate_status == ActionResponse.SUCCESS:
                     break
         else:
-            self.load_tokens()
-
+            self.load_tokens(token_data=token_data)
+
+    def _get_prefetch_pool(self) -> ThreadPoolExecutor:
+        """Expiry prefetch pool shared by every get_option_chain call on this consumer."""
+        with self._prefetch_lock:
+            if self._prefetch_pool is None:
+                self._prefetch_pool = ThreadPoolExecutor(max_workers=OPTION_CHAIN_PREFETCH, thread_name_prefix="ChainPrefetch")
+                # Weak so a consumer dropped without close() (e.g. rebuilt on re-auth) can still be collected
+                consumer_ref = weakref.ref(self)
+
+                def _shutdown(reason=None):
+                    consumer = consumer_ref()
+                    if consumer is not None:
+                        consumer.close()
+
+                self._prefetch_shutdown = _shutdown
+                ShutdownManager.register("Option Chain Prefetch", self._prefetch_shutdown)
+            return self._prefetch_pool
+
+    def close(self):
+        with self._prefetch_lock:
+            pool, self._prefetch_pool = self._prefetch_pool, None
+            callback, self._prefetch_shutdown = self._prefetch_shutdown, None
+        if callback is not None:
+            ShutdownManager.unregister("Option Chain Prefetch", callback)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
 
     def get(self, url: str, headers=None, params=None):
-        # Existing headers (may be None)
-        headers = headers or {}  # ensure it's a dict
-
-        # Add/overwrite Accept header
-        headers.update({"Accept": "application/json"})
-        
+        # Accept: application/json is set once on the session
+        if params and params.get("symbol") and self._invalid_symbols.get(params["symbol"]):
+            # E*TRADE rejected this symbol (10033) within INVALID_SYMBOL_TTL; skip the round-trip
+            raise InvalidSymbolError(f"Invalid symbol {params['symbol']} (cached)")
         if self.apiWorker is not None:
             error = ""
             r = self.apiWorker.call_api(HttpMethod.GET, url, headers=headers, params=params)
@@ -87,7 +201,7 @@ class EtradeConsumer:
                     if hasattr(r,"response"):
                         return r.response
                     else:
-                        raise Exception(f"Response to {url} does not contain a response attribute: {json.dumps(r, indent=2, default=str)}")
+                        raise Exception(f"Response to {url} does not contain a response attribute: {r}")
                 else:
                     # --- detect HTTP 401 Unauthorized ---
                     status_code = None
@@ -98,27 +212,26 @@ class EtradeConsumer:
                             status_code = r.response.status_code
                     if status_code == 401:
                         self.logger.logMessage("[Auth] Token expired or unauthorized, need to regenerate")
+                        self._token_cache.pop(self.token_file, None)
+                        self._session_valid_until.pop(self.token_file, None)
                         self.token_status.set_status(False)
                         raise TokenExpiredError("OAuth token expired")  
                     elif status_code == 408:
                         raise TimeoutError    
                     elif status_code == 400:
-                        error = ""
-                        if hasattr(r,"response"):
-                            error = r.response.text
-                        else:
-                            error = r.error
-                        if "10033" in error:
-                            raise InvalidSymbolError(error)
-                        elif "10031" in error or "10032 in error":
-                            write_scratch(f"Error: {error} | Params: {str(params)}")
-                            raise (NoOptionsError(error))
+                        body = r.response
+                        error = body.text if body is not None and hasattr(body, "text") else r.error
+                        # Any 400 without a recognised code has always been treated as "no options"
+                        exc_type = _ERROR_CODE_EXCEPTIONS.get(r.error_code, NoOptionsError)
+                        if exc_type is InvalidSymbolError:
+                            if params and params.get("symbol"):
+                                self._invalid_symbols.put(params["symbol"], True)
                         else:
                             write_scratch(f"Error: {error} | Params: {str(params)}")
-                            raise Exception(error)
+                        raise exc_type(error)
    
                     else:
-                        raise Exception(f"Response received an error. Calculated status code: {status_code}. Response: {json.dumps(r, indent=2, default=str)}")        
+                        raise Exception(f"Response received an error. Calculated status code: {status_code}. Error: {r.error}")        
             else:
                 raise Exception(f"No response received for {url}")
         else:
@@ -149,18 +262,17 @@ class EtradeConsumer:
             "Authorization": f"Bearer {self.oauth_token}"
         })
         
+        # Serialize once to bytes on both paths; requests sends them as-is (Content-Type is set above)
+        payload = None if data is None else orjson.dumps(data)
         if self.apiWorker is not None:
-            # apiWorker expects params; encode data as JSON string
-            payload = json.dumps(data) if data else None
-            response = self.apiWorker.call_api(HttpMethod.PUT, url, headers=headers, params=params, data=payload)
-            if response.get("ok"):
-                return response.get("data")
-            else:
-                self.logger.logMessage(f"Error {response.get('status_code')}: {response.get('error')}")
-                return None
+            r = self.apiWorker.call_api(HttpMethod.PUT, url, headers=headers, params=params, data=payload)
+            if r.ok:
+                return r.response
+            self.logger.logMessage(f"Error {r.status_code}: {r.error}")
+            return None
         else:
             try:
-                return self.session.put(url, headers=headers, params=params, json=data)
+                return self.session.put(url, headers=headers, params=params, data=payload)
             except Exception as e:
                 self.logger.logMessage(f"[PUT Exception] {e} for URL: {url}")
                 return None
@@ -181,18 +293,17 @@ class EtradeConsumer:
             "Authorization": f"Bearer {self.oauth_token}"
         })
 
+        # Serialize once to bytes on both paths; requests sends them as-is (Content-Type is set above)
+        payload = None if data is None else orjson.dumps(data)
         if self.apiWorker is not None:
-            # apiWorker expects params; encode data as JSON string
-            payload = json.dumps(data) if data else None
-            response = self.apiWorker.call_api(HttpMethod.POST, url, headers=headers, params=params, data=payload)
-            if response.get("ok"):
-                return response.get("data")
-            else:
-                self.logger.logMessage(f"Error {response.get('status_code')}: {response.get('error')}")
-                return None
+            r = self.apiWorker.call_api(HttpMethod.POST, url, headers=headers, params=params, data=payload)
+            if r.ok:
+                return r.response
+            self.logger.logMessage(f"Error {r.status_code}: {r.error}")
+            return None
         else:
             try:
-                resp = self.session.post(url, headers=headers, params=params, json=data)
+                resp = self.session.post(url, headers=headers, params=params, data=payload)
                 return resp
             except Exception as e:
                 self.logger.logMessage(f"[POST Exception] {e} for URL: {url}")
@@ -200,12 +311,22 @@ class EtradeConsumer:
 
 
     # ------------------- TOKENS -------------------
-    def load_tokens(self, generate_new_token=True):
+    def _read_token_file(self):
+        """Saved token data, or None if there is no token file yet."""
+        cached = self._token_cache.get(self.token_file)
+        if cached is not None:
+            return cached
+        try:
+            token_data = orjson.loads(Path(self.token_file).read_bytes())
+        except FileNotFoundError:
+            return None
+        self._token_cache[self.token_file] = token_data
+        return token_data
+
+    def load_tokens(self, generate_new_token=True, token_data=None):
         """Load saved tokens or generate if missing/expired."""
-        token_data = {}
-        if os.path.exists(self.token_file):
-            with open(self.token_file, "r") as f:
-                token_data = json.load(f)
+        if token_data is None:
+            token_data = self._read_token_file() or {}
 
         self.oauth_token = token_data.get("oauth_token")
         self.oauth_token_secret = token_data.get("oauth_token_secret")
@@ -213,18 +334,12 @@ class EtradeConsumer:
 
         # Build OAuth1 session if we have tokens
         if self.oauth_token and self.oauth_token_secret:
-            self.session = OAuth1Session(
-                self.consumer_key,
-                client_secret=self.consumer_secret,
-                resource_owner_key=self.oauth_token,
-                resource_owner_secret=self.oauth_token_secret,
-            )
+            self.session = self._build_session()
 
         # Check token age
-        local_tz = datetime.now().astimezone().tzinfo
-        token_age_days = (datetime.now().astimezone() - datetime.fromtimestamp(created_at, tz=local_tz)).days
-        if (not self.oauth_token or token_age_days >= TOKEN_LIFETIME_DAYS) and generate_new_token:
-            self.logger.logMessage(f"Token missing or expired (age={token_age_days}d). Generating new token...")
+        token_age_seconds = pyTime.time() - created_at
+        if (not self.oauth_token or token_age_seconds >= TOKEN_LIFETIME_DAYS * 86400) and generate_new_token:
+            self.logger.logMessage(f"Token missing or expired (age={int(token_age_seconds // 86400)}d). Generating new token...")
             if not self.generate_token():
                 raise Exception("Failed to generate new OAuth token.")
         else:
@@ -258,10 +373,14 @@ class EtradeConsumer:
 
     def _check_session_valid(self):
         """Simple API test to check if the current session is valid."""
+        if pyTime.monotonic() < self._session_valid_until.get(self.token_file, 0.0):
+            return True
         try:
-            url = f"{self.base_url}/v1/accounts/list.json"
-            r = self.get(url)
-            return r and getattr(r, "status_code", 200) == 200
+            r = self.get(self._accounts_url)
+            valid = bool(r) and getattr(r, "status_code", 200) == 200
+            if valid:
+                self._session_valid_until[self.token_file] = pyTime.monotonic() + SESSION_VALID_TTL
+            return valid
         except Exception as e:
             self.logger.logMessage(f"[Token Validation] Session check failed: {e}")
             return False
@@ -276,11 +395,11 @@ class EtradeConsumer:
             try:
                 request_token_url = f"{self.base_url}/oauth/request_token"
 
-                oauth = OAuth1Session(
+                oauth = self._pooled(OAuth1Session(
                     self.consumer_key,
                     client_secret=self.consumer_secret,
                     callback_uri="oob"
-                )
+                ))
                 fetch_response = oauth.fetch_request_token(request_token_url)
                 resource_owner_key = fetch_response.get("oauth_token")
                 resource_owner_secret = fetch_response.get("oauth_token_secret")
@@ -312,24 +431,19 @@ class EtradeConsumer:
 
                 try:
                     # Step 4: Exchange PIN for access token
-                    oauth = OAuth1Session(
+                    oauth = self._pooled(OAuth1Session(
                         self.consumer_key,
                         client_secret=self.consumer_secret,
                         resource_owner_key=resource_owner_key,
                         resource_owner_secret=resource_owner_secret,
                         verifier=verifier
-                    )
+                    ))
                     access_token_response = oauth.fetch_access_token(access_token_url)
 
                     # Store tokens
                     self.oauth_token = access_token_response.get("oauth_token")
                     self.oauth_token_secret = access_token_response.get("oauth_token_secret")                    # Persist to disk
-                    self.session = OAuth1Session(
-                        self.consumer_key,
-                        client_secret=self.consumer_secret,
-                        resource_owner_key=self.oauth_token,
-                        resource_owner_secret=self.oauth_token_secret,
-                    )                    
+                    self.session = self._build_session()
                     self.save_tokens()
 
                     self.logger.logMessage("[Auth] Access token successfully obtained and saved")
@@ -344,52 +458,78 @@ class EtradeConsumer:
 
     def save_tokens(self):
         """Save the current token data to disk with a timestamp."""
-        with open(self.token_file, "w") as f:
-            json.dump({
-                "oauth_token": self.oauth_token,
-                "oauth_token_secret": self.oauth_token_secret,
-                "created_at": int(pyTime.time())  # store as epoch
-            }, f)
+        token_data = {
+            "oauth_token": self.oauth_token,
+            "oauth_token_secret": self.oauth_token_secret,
+            "created_at": int(pyTime.time())  # store as epoch
+        }
+        buf = orjson.dumps(token_data)
+        # Atomic swap: a torn token file would force a manual OAuth re-auth
+        tmp_path = f"{self.token_file}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buf)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.token_file)
+        self._token_cache[self.token_file] = token_data
         self.token_status.set_status(True)
 
     # ------------------- HELPERS -------------------
-    def get_headers(self):
-        return {"Content-Type": "application/json"}
-
-    def load_encrypted_etrade_keysecret(self, sandbox=True):
-        with open("encryption/secret.key", "rb") as key_file:
-            key = key_file.read()
-        sandbox_suffix = "sandbox" if sandbox else "prod"
-        with open(f"encryption/etrade_consumer_key_{sandbox_suffix}.enc", "rb") as enc_file:
-            encrypted_key = enc_file.read()
-        with open(f"encryption/etrade_consumer_secret_{sandbox_suffix}.enc", "rb") as enc_file:
-            encrypted_secret = enc_file.read()
-        f = Fernet(key)
-        return f.decrypt(encrypted_key).decode(), f.decrypt(encrypted_secret).decode()
+    def _build_session(self) -> OAuth1Session:
+        """OAuth1 session with pooled keep-alive connections, reused for every request."""
+        session = self._pooled(OAuth1Session(
+            self.consumer_key,
+            client_secret=self.consumer_secret,
+            resource_owner_key=self.oauth_token,
+            resource_owner_secret=self.oauth_token_secret,
+        ))
+        session.headers.update({"Accept": "application/json"})
+        return session
+
+    def _pooled(self, session: OAuth1Session) -> OAuth1Session:
+        """Route the session's HTTPS traffic through this consumer's shared connection pool."""
+        session.mount("https://", self._adapter)
+        return session
 
     # ------------------- ACCOUNT / PORTFOLIO -------------------
     def get_accounts(self):
-        url = f"{self.base_url}/v1/accounts/list.json"
-        r = self.get(url)
+        if self._accounts is not None and pyTime.monotonic() < self._accounts_valid_until:
+            return list(self._accounts)
+        r = self.get(self._accounts_url)
         try:
-            accts = r.json().get("AccountListResponse", {}).get("Accounts", {}).get("Account", [])
-            return [Account(**acct) for acct in accts]
+            accts = _json(r).get("AccountListResponse", {}).get("Accounts", {}).get("Account", [])
+            accounts = [Account(**acct) for acct in accts]
+            if accounts:
+                self._accounts = accounts
+                self._accounts_valid_until = pyTime.monotonic() + ACCOUNTS_TTL
+            return list(accounts)
         except Exception as e:
             self.logger.logMessage(f"[ERROR] Failed to parse account ID: {e}")
             return []
 
+    def invalidate_accounts(self):
+        """Force the next get_accounts() to re-fetch the account list."""
+        self._accounts = None
+        self._accounts_valid_until = 0.0
+
     def get_positions(self):
         accounts = self.get_accounts()
         all_positions = []
-        for acct in accounts:
-            url = f"{self.base_url}/v1/accounts/{acct.accountIdKey}/portfolio.json"
-            r = self.get(url)
-            data = r.json()
-            account_portfolios = data.get("PortfolioResponse", {}).get("AccountPortfolio", [])
-            for acct_raw in account_portfolios:
-                portfolio = PortfolioAccount.from_dict(acct_raw)
-                all_positions.extend(portfolio.Position or [])
+        if not accounts:
+            return all_positions
+        keys = [acct.accountIdKey for acct in accounts]
+        # Portfolio requests are independent; fetch and parse each on the pooled session in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(keys)), thread_name_prefix="Portfolio") as pool:
+            for positions in pool.map(self._fetch_portfolio, keys):
+                all_positions.extend(positions)
         return all_positions
+
+    def _fetch_portfolio(self, account_id_key):
+        """Positions held in one account."""
+        r = self.get(self._portfolio_url_fmt.format(key=account_id_key))
+        account_portfolios = _json(r).get("PortfolioResponse", {}).get("AccountPortfolio", [])
+        # Build positions straight from each portfolio's list; the PortfolioAccount wrapper was discarded anyway
+        return [Position(**p) for acct_raw in account_portfolios for p in acct_raw.get("Position") or ()]
     
         #How much capital is currently outstanding (ie don't buy more than comfortable)
     def get_open_exposure(self):
@@ -401,7 +541,7 @@ class EtradeConsumer:
     # ------------------- OPTION CHAINS -------------------
     
     def get_expiry_dates(self, symbol):
-        url = f"{self.base_url}/v1/market/optionexpiredate.json"
+        url = self._expiry_url
         params = {"symbol": symbol}
         try:
             response = self.get(url, params=params)
@@ -417,26 +557,26 @@ class EtradeConsumer:
             raise NoExpiryError(f"Ticker returned no expiry dates")
 
         try:
-            data = response.json()
-            expiry_list = data.get("OptionExpireDateResponse", {}).get("ExpirationDate", [])
+            expiry_list = expiry_decoder.decode(response.content).OptionExpireDateResponse.ExpirationDate
             # Return simplified dicts with year/month/day
             return [
-                {"year": e.get("year"), "month": e.get("month"), "day": e.get("day"), "expiryType": e.get("expiryType")}
+                {"year": e.year, "month": e.month, "day": e.day, "expiryType": e.expiryType}
                 for e in expiry_list
             ]
         except Exception as e:
             raise Exception(f"Failed to parse expiry dates response for {symbol}: {e}")
 
 
-    def get_option_chain(self, symbol, date_range=None):
-        url = f"{self.base_url}/v1/market/optionchains.json"
-        params = {
-            "symbol": symbol,
-            "includeWeekly": "true",
-            "strategy": "SINGLE",
-            "skipAdjusted": "false",
-            "chainType": "CALL",
-        }
+    def get_option_chain(self, symbol, date_range=None, force=False):
+        # Only the default (all expiries) chain is memoized; pass force=True to bypass
+        if date_range is None and not force:
+            cached = self._chain_memo.get(symbol)
+            if cached is not None:
+                return list(cached)
+
+        url = self._chain_url
+        params = dict(self._CHAIN_PARAMS)
+        params["symbol"] = symbol
 
         # Resolve expiry dates
         expiry_dates = []
@@ -463,102 +603,185 @@ class EtradeConsumer:
 
         results = []
 
-        # Loop across all target expiries
-        for expiry in expiry_dates:
-            params.update({
+        def fetch_expiry(expiry):
+            expiry_params = {
+                **params,
                 "expiryYear": expiry["year"],
                 "expiryMonth": expiry["month"],
                 "expiryDay": expiry["day"]
-            })
-
+            }
             try:
-                response = self.get(url, params=params)
+                response = self.get(url, params=expiry_params)
                 self.inspect_response(symbol, response)
             except Exception as e:
-                data = f"Ticker: {symbol}, Params: {str(params)}"
+                data = f"Ticker: {symbol}, Params: {str(expiry_params)}"
                 self.handle_exception(e,data)
+            return response
+
+        # Sliding window: keep the next expiries in flight while the current one is parsed.
+        # The ApiWorker rate limiter still spaces the requests across all of them.
+        pool = self._get_prefetch_pool()
+        pending = deque()
+        remaining_expiries = iter(expiry_dates)
+        try:
+            for expiry in remaining_expiries:
+                pending.append(pool.submit(fetch_expiry, expiry))
+                if len(pending) >= OPTION_CHAIN_PREFETCH:
+                    break
+
+            while pending:
+                response = pending.popleft().result()
+                next_expiry = next(remaining_expiries, None)
+                if next_expiry is not None:
+                    pending.append(pool.submit(fetch_expiry, next_expiry))
+
+                # If we are here means response.ok == true
+                results.extend(self._parse_option_chain(symbol, response))
+        finally:
+            # Drop this symbol's queued expiries (e.g. after a failed one); the pool itself is reused
+            for fut in pending:
+                fut.cancel()
 
-            # If we are here means response.ok == true
-            local_tz = datetime.now().astimezone().tzinfo
+        if date_range is None:
+            self._chain_memo.put(symbol, tuple(results))
+        return results
 
+    def get_option_chains_batch(self, symbols, max_workers=8):
+        """
+        Fetch option chains for many symbols concurrently.
+        Returns {symbol: (results, ok)}; a failed symbol maps to ([], False) instead of aborting the batch.
+        Throughput is still capped by the ApiWorker rate limiter when one is attached.
+        """
+        def fetch(symbol):
             try:
-                chain_data = response.json().get("OptionChainResponse", {})
-                near_price = chain_data.get("nearPrice")
-                expiry_dict = chain_data.get("SelectedED", {})
-                expiry_date = datetime(
-                    year=expiry_dict.get("year", 1970),
-                    month=expiry_dict.get("month", 1),
-                    day=expiry_dict.get("day", 1),
-                    tzinfo=local_tz
+                return self.get_option_chain(symbol), True
+            except Exception as e:
+                self.logger.logMessage(f"[Option Chain] {symbol} failed in batch: {e}")
+                return [], False
+
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols)), thread_name_prefix="ChainBatch") as pool:
+            return dict(zip(symbols, pool.map(fetch, symbols)))
+
+    def _parse_option_chain(self, symbol, response):
+        results = []
+        local_tz = datetime.now().astimezone().tzinfo
+
+        try:
+            # Decode the raw bytes straight into the wire structs; no intermediate dicts
+            chain_data = chain_decoder.decode(response.content).OptionChainResponse
+            near_price = chain_data.nearPrice
+            expiry = chain_data.SelectedED
+            expiry_date = datetime(
+                year=expiry.year,
+                month=expiry.month,
+                day=expiry.day,
+                tzinfo=local_tz
+            )
+
+            # Hot loop on wide scans: bind constructors and per-chain constants to locals once
+            OC, P, PId, Q, OG = OptionContract, Product, ProductId, Quick, OptionGreeks
+            expiry_day, expiry_month, expiry_year = expiry.day, expiry.month, expiry.year
+            append = results.append
+            call_fields, greek_fields = _CALL_FIELDS, _GREEK_FIELDS
+
+            for optionPair in chain_data.OptionPair:
+                call = optionPair.Call
+                if call is None:
+                    continue
+                greeks = call.OptionGreeks
+                option_greeks = OG(*greek_fields(greeks)) if greeks is not None else OG()
+
+                option_symbol, option_type = call.symbol, call.optionType
+                product = P(
+                    symbol=option_symbol,
+                    securityType=option_type,
+                    callPut="CALL" if option_type == "CALL" else "PUT",
+                    strikePrice=call.strikePrice,
+                    productId=PId(symbol=option_symbol, typeCode=option_type),
+                    expiryDay=expiry_day,
+                    expiryMonth=expiry_month,
+                    expiryYear=expiry_year
                 )
 
-                for optionPair in chain_data.get("OptionPair", []):
-                    call = optionPair.get("Call", {})
-                    call["expiryDate"] = expiry_date
-                    call["nearPrice"] = near_price
-                    call_greeks = call.get("OptionGreeks", {})
-                    option_greeks = OptionGreeks(**call_greeks)
-
-                    product = Product(
-                        symbol=call.get("symbol"),
-                        securityType=call.get("optionType"),
-                        callPut="CALL" if call.get("optionType") == "CALL" else "PUT",
-                        strikePrice=call.get("strikePrice"),
-                        productId=ProductId(symbol=call.get("symbol"), typeCode=call.get("optionType")),
-                        expiryDay=expiry_date.day,
-                        expiryMonth=expiry_date.month,
-                        expiryYear=expiry_date.year
-                    )
-
-                    quick = Quick(
-                        lastTrade=call.get("lastPrice"),
-                        lastTradeTime=None,
-                        change=None,
-                        changePct=None,
-                        volume=call.get("volume"),
-                        quoteStatus=None
-                    )
-
-                    option_fields = {k: call[k] for k in [
-                        "symbol", "optionType", "strikePrice", "displaySymbol", "osiKey",
-                        "bid", "ask", "bidSize", "askSize", "inTheMoney", "volume",
-                        "openInterest", "netChange", "lastPrice", "quoteDetail",
-                        "optionCategory", "timeStamp", "adjustedFlag", "expiryDate", "nearPrice"
-                    ] if k in call}
-
-                    option = OptionContract(
-                        **option_fields,
-                        OptionGreeks=option_greeks,
-                        quick=quick,
-                        product=product
-                    )
-
-                    results.append(option)
-            except Exception as e:
-                errorMessage = f"[ERROR] Failed to parse option chain for {symbol}: {e}"
-                raise Exception(errorMessage)
+                quick = Q(lastTrade=call.lastPrice, volume=call.volume)
+
+                append(OC(
+                    *call_fields(call),
+                    expiryDate=expiry_date,
+                    nearPrice=near_price,
+                    OptionGreeks=option_greeks,
+                    quick=quick,
+                    product=product
+                ))
+        except Exception as e:
+            errorMessage = f"[ERROR] Failed to parse option chain for {symbol}: {e}"
+            raise Exception(errorMessage)
 
         return results
 
     # ------------------- QUOTES -------------------
-    def get_quote(self, symbol):
-        url = f"{self.base_url}/v1/market/quote/{symbol}.json"
-        r,error= self.get(url)
+    def get_quote(self, symbol, force=False):
+        if not force:
+            cached = self._quote_memo.get(symbol)
+            if cached is not None:
+                return cached
+        url = self._quote_url_fmt.format(symbol=symbol)
+        r = self.get(url)
         try:
-            qdata = r.json().get("QuoteResponse", {}).get("QuoteData", [])[0]
-            product = Product(symbol=symbol)
-            quick = Quick(
-                lastTrade=qdata.get("lastTrade"),
-                lastTradeTime=None,
-                change=qdata.get("change"),
-                changePct=qdata.get("changePct"),
-                volume=qdata.get("volume"),
-                quoteStatus=qdata.get("quoteStatus")
-            )
-            return Position(Product=product, Quick=quick)
+            qdata = _json(r).get("QuoteResponse", {}).get("QuoteData", [])[0]
+            quote = self._quote_position(symbol, qdata)
+            self._quote_memo.put(symbol, quote)
+            return quote
         except Exception as e:
             self.logger.logMessage(f"[ERROR] Failed to parse quote for {symbol}: {e}")
             return None
+
+    def get_quotes(self, symbols, max_workers=4) -> dict:
+        """
+        Quote many symbols using the multi-symbol endpoint, QUOTE_BATCH_SIZE per request.
+        Returns {symbol: Position}; symbols whose chunk failed or that came back without a symbol are left out.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        chunks = [symbols[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(symbols), QUOTE_BATCH_SIZE)]
+        if not chunks:
+            return {}
+
+        def fetch(chunk):
+            url = self._quote_url_fmt.format(symbol=",".join(chunk))
+            try:
+                quote_data = _json(self.get(url)).get("QuoteResponse", {}).get("QuoteData", [])
+                # Key by the symbol E*TRADE echoes back: QuoteData may skip or reorder invalid symbols
+                pairs = []
+                for qdata in quote_data:
+                    symbol = qdata.get("Product", {}).get("symbol")
+                    if symbol:
+                        pairs.append((symbol, qdata))
+                return pairs
+            except Exception as e:
+                self.logger.logMessage(f"[ERROR] Failed to fetch quotes for {','.join(chunk)}: {e}")
+                return []
+
+        quotes = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="Quotes") as pool:
+            for pairs in pool.map(fetch, chunks):
+                for symbol, qdata in pairs:
+                    quotes[symbol] = self._quote_position(symbol, qdata)
+        return quotes
+
+    def _quote_position(self, symbol, qdata):
+        product = Product(symbol=symbol, securityType=qdata.get("Product", {}).get("securityType"))
+        quick = Quick(
+            lastTrade=qdata.get("lastTrade"),
+            lastTradeTime=None,
+            change=qdata.get("change"),
+            changePct=qdata.get("changePct"),
+            volume=qdata.get("volume"),
+            quoteStatus=qdata.get("quoteStatus")
+        )
+        return Position(Product=product, Quick=quick)
         
     def handle_exception(self,e, data):
         if isinstance(e,NoOptionsError):
@@ -575,7 +798,7 @@ class EtradeConsumer:
                 raise TimeoutError(f"Timeout received when processing options for {symbol}")
 
             try:
-                error = json.loads(response.text)
+                error = _json(response)
                 error_code = error["Error"]["code"]
 
                 if error_code == 10033 or "10033" in error:
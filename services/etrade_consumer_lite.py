@@ -22,6 +22,11 @@ class EtradeConsumerLite:
         self.consumer_key, self.consumer_secret = self.load_encrypted_etrade_keysecret(sandbox)
         self.token_file = os.path.join("encryption", f"etrade_tokens_{envType}.json")
         self.base_url = "https://apisb.etrade.com" if sandbox else "https://api.etrade.com"
+        self._accounts_url = f"{self.base_url}/v1/accounts/list.json"
+        self._expiry_url = f"{self.base_url}/v1/market/optionexpiredate.json"
+        self._chain_url = f"{self.base_url}/v1/market/optionchains.json"
+        self._quote_url_fmt = self.base_url + "/v1/market/quote/{symbol}.json"
+        self._portfolio_url_fmt = self.base_url + "/v1/accounts/{key}/portfolio.json"
 
         if not self.consumer_key:
             raise Exception("Missing E*TRADE consumer key")
@@ -107,7 +112,7 @@ class EtradeConsumerLite:
     def _check_session_valid(self):
         """Simple API test to check if the current session is valid."""
         try:
-            url = f"{self.base_url}/v1/accounts/list.json"
+            url = self._accounts_url
             r = self.get(url)
             return r and getattr(r, "status_code", 200) == 200
         except Exception as e:
@@ -217,7 +222,7 @@ class EtradeConsumerLite:
 
     # ------------------- ACCOUNT / PORTFOLIO -------------------
     def get_accounts(self):
-        url = f"{self.base_url}/v1/accounts/list.json"
+        url = self._accounts_url
         r = self.get(url)
         try:
             accts = r.json().get("AccountListResponse", {}).get("Accounts", {}).get("Account", [])
@@ -230,7 +235,7 @@ class EtradeConsumerLite:
         accounts = self.get_accounts()
         all_positions = []
         for acct in accounts:
-            url = f"{self.base_url}/v1/accounts/{acct.accountIdKey}/portfolio.json"
+            url = self._portfolio_url_fmt.format(key=acct.accountIdKey)
             r = self.get(url)
             data = r.json()
             account_portfolios = data.get("PortfolioResponse", {}).get("AccountPortfolio", [])
@@ -248,7 +253,7 @@ class EtradeConsumerLite:
 
     # ------------------- OPTION CHAINS -------------------
     def get_expiry_dates(self, symbol):
-        url = f"{self.base_url}/v1/market/optionexpiredate.json"
+        url = self._expiry_url
         params = {"symbol": symbol}
         try:
             response = self.get(url, params=params)
@@ -266,7 +271,7 @@ class EtradeConsumerLite:
         
         
     def get_option_chain(self, symbol):
-        url = f"{self.base_url}/v1/market/optionchains.json"
+        url = self._chain_url
         params = {
             "symbol": symbol,
             "includeWeekly": "true",
@@ -296,7 +301,7 @@ class EtradeConsumerLite:
 
     # ------------------- QUOTES -------------------
     def get_quote(self, symbol):
-        url = f"{self.base_url}/v1/market/quote/{symbol}.json"
+        url = self._quote_url_fmt.format(symbol=symbol)
         r= self.get(url)
         try:
             qdata = r.json().get("QuoteResponse", {}).get("QuoteData", [])[0]
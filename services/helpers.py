@@ -1,26 +1,26 @@
 import inspect
 import importlib
-import builtins
+import io
+from contextlib import redirect_stdout
 
-def snapshot_module(module, capture_prints=True):
-    """Show a detailed snapshot of a loaded module, including functions, classes, variables, and optionally captures top-level prints."""
+def snapshot_module(module, capture_prints=True, reload=False):
+    """Show a detailed snapshot of a loaded module, including functions, classes, variables, and optionally captures top-level prints.
+
+    The module is inspected as already loaded. Pass reload=True to re-execute it first (diagnostics only:
+    that re-runs all module-level code); its top-level prints are captured when capture_prints is set.
+    """
     output_lines = []
     
-    # Capture top-level prints if requested
     captured_prints = []
-    if capture_prints:
-        old_print = builtins.print
-        def fake_print(*args, **kwargs):
-            captured_prints.append(" ".join(str(a) for a in args))
-            old_print(*args, **kwargs)
-        builtins.print = fake_print
-
-    try:
-        # Reload the module
-        importlib.reload(module)
-    finally:
+    if reload:
         if capture_prints:
-            builtins.print = old_print
+            # Capture top-level prints emitted while the module re-executes
+            buffer = io.StringIO()
+            with redirect_stdout(buffer):
+                importlib.reload(module)
+            captured_prints = buffer.getvalue().splitlines()
+        else:
+            importlib.reload(module)
 
     output_lines.append(f"=== MODULE SNAPSHOT: {module.__name__} ===\n")
     
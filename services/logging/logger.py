@@ -1,7 +1,9 @@
 # services/logging/logger.py
 import logging
 import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 class Logger:
     def __init__(self, log_dir="logs", prefix="log"):
@@ -17,29 +19,42 @@ class Logger:
             self.logger.removeHandler(h)
 
         # File handler
-        fh = logging.FileHandler(log_file, mode="a", encoding="utf-8")
+        fh = logging.FileHandler(log_file, mode="a", encoding="utf-8", delay=True)
         fh.setFormatter(logging.Formatter("%(asctime)s - %(message)s", "%Y-%m-%d %H:%M:%S"))
-        self.logger.addHandler(fh)
+        fh.addFilter(lambda record: getattr(record, "to_file", True))
 
         # Console handler
         ch = logging.StreamHandler()
         ch.setFormatter(logging.Formatter("%(asctime)s: %(message)s"))
-        self.logger.addHandler(ch)
+        ch.addFilter(lambda record: getattr(record, "to_console", True))
+
+        # Callers only enqueue; a background listener does the disk/console writes
+        log_queue = queue.SimpleQueue()
+        self._queue_handler = QueueHandler(log_queue)
+        self.logger.addHandler(self._queue_handler)
+        self._listener = QueueListener(log_queue, fh, ch)
+        self._listener.start()
 
         # Keep references
         self._file_handler = fh
         self._console_handler = ch
 
     def logMessage(self, message, console=True, file=True):
-        # Temporarily enable/disable handlers
-        self._file_handler.setLevel(logging.INFO if file else logging.CRITICAL+1)
-        self._console_handler.setLevel(logging.INFO if console else logging.CRITICAL+1)
-        self.logger.info(message)
-        self.flush()
+        # Routing travels on the record so concurrent callers can't flip each other's handlers
+        self.logger.info(message, extra={"to_console": console, "to_file": file})
         
     def flush(self):
-        for handler in self.logger.handlers:
-            handler.flush()
+        self._file_handler.flush()
+        self._console_handler.flush()
 
     def _log_exit(self, reason=None):
-        self.log(f"Script terminated ({reason})")
+        self.logMessage(f"Script terminated ({reason})")
+        if self._listener is None:
+            return
+        # Drain everything still queued, then write synchronously for anything logged during shutdown
+        self._listener.stop()
+        self._listener = None
+        self.logger.removeHandler(self._queue_handler)
+        self.logger.addHandler(self._file_handler)
+        self.logger.addHandler(self._console_handler)
+        self.flush()
@@ -1,9 +1,17 @@
 # modeltest.py
 
+import functools
 import importlib
 import requests
 import os
-from pydantic import ValidationError, parse_obj_as
+from pydantic import TypeAdapter, ValidationError
+
+
+@functools.lru_cache(maxsize=None)
+def _model_adapter(model_name: str) -> TypeAdapter:
+    mod = importlib.import_module("models.generated." + model_name)
+    return TypeAdapter(getattr(mod, model_name))
+
 
 def validate_api_model(url: str, model_name: str):
     auth = os.getenv("MODELTEST_BEARER")
@@ -14,11 +22,10 @@ def validate_api_model(url: str, model_name: str):
         print(f"[ERROR] API returned status {r.status_code}")
         return
 
-    data = r.json()
     try:
-        mod = importlib.import_module("models.generated." + model_name)
-        model_class = getattr(mod, model_name)
-        parsed = parse_obj_as(model_class, data)
+        adapter = _model_adapter(model_name)
+        # Validate straight from the response bytes; no intermediate r.json() decode
+        parsed = adapter.validate_json(r.content)
         print(f"[SUCCESS] Data matched {model_name} model")
     except ValidationError as ve:
         print(f"[FAILURE] Validation error in {model_name}:")
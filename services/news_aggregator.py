@@ -15,25 +15,44 @@ Design:
  - Defensive: never raises to caller, always returns safe results.
 """
 
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, asdict, is_dataclass
+from typing import Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 import os
 import requests
+from requests.adapters import HTTPAdapter
 import feedparser
 import math
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 import re
+import hashlib
+import threading
+from collections import OrderedDict
 from html import unescape
-import re
+from xml.etree import ElementTree
+from models.news_response import newsapi_decoder, newsdata_decoder
 from services.logging.logger_singleton import getLogger
 from services.core.cache_manager import RateLimitCache,HeadlineCache
+from services.core.ttl_memo import TtlMemo
 from services.scanner.scanner_utils import is_rate_limited
 
 logger = getLogger()
 
+# One keep-alive session for the REST clients; repeat calls to the same host skip the
+# TCP/TLS handshake. Session.get is safe to share across the aggregator's fetch threads.
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+HTTP_TIMEOUT = (3, 10)  # (connect, read) seconds
+
 # -------------------------------------------------------
 # Headline model
 # -------------------------------------------------------
-@dataclass
+@dataclass(slots=True)
 class Headline:
     source: str
     title: str
@@ -60,6 +79,9 @@ class NewsClientBase:
 
 
 class NewsAPIClient(NewsClientBase):
+    URL = "https://newsapi.org/v2/everything"
+    SOURCES = "bloomberg,reuters,the-wall-street-journal,cnbc,marketwatch,the-new-york-times,financial-times,forbes,business-insider,yahoo-news"
+
     def __init__(self, rate_cache, logger):
         super().__init__(rate_cache, logger)
         self.api_key = os.getenv("NEWSAPI_KEY")
@@ -72,10 +94,6 @@ class NewsAPIClient(NewsClientBase):
         if self.rate_cache is not None and is_rate_limited(self.rate_cache, "NewsAPI"):
             return []
         
-        news_sources_str = "bloomberg,reuters,the-wall-street-journal,cnbc,marketwatch,the-new-york-times,financial-times,forbes,business-insider,yahoo-news"
-
-        url = "https://newsapi.org/v2/everything"
-       
         keyword = ticker_name
         if ticker_name == "" or ticker_name is None:
             keyword = ticker
@@ -83,36 +101,39 @@ class NewsAPIClient(NewsClientBase):
         params = {
             "q": f'{keyword}',          # wraps in quotes for exact matching
             "language": "en",
-            "sources": news_sources_str,
+            "sources": self.SOURCES,
             "sortBy": "publishedAt",
             "pageSize": 50,
             "apiKey": self.api_key
         }
         try:
-            resp = requests.get(url, params=params)
+            resp = _SESSION.get(self.URL, params=params, timeout=HTTP_TIMEOUT)
             if resp.status_code == 429:
                 self.logger.logMessage("[NewsAPI] Rate limited (429)")
                 if self.rate_cache is not None:
                     self.rate_cache.add("NewsAPI", 3600 * 24)
                 return None
             resp.raise_for_status()
-            data = resp.json().get("articles", []) or []
-            out = []
-            for it in data:
-                out.append(Headline(
+            articles = newsapi_decoder.decode(resp.content).articles or []
+            return [
+                Headline(
                     source="newsapi",
-                    title=it.get("title") or "",
-                    description=it.get("description"),
-                    url=it.get("url"),
-                    published_at=it.get("publishedAt")
-                ))
-            return out
+                    title=it.title or "",
+                    description=it.description,
+                    url=it.url,
+                    published_at=it.publishedAt
+                )
+                for it in articles
+            ]
         except Exception as e:
             self.logger.logMessage(f"[NewsAPI] fetch error: {e}")
             return []
 
 
 class NewsDataClient(NewsClientBase):
+    URL = "https://newsdata.io/api/1/news"
+    CATEGORIES = ",".join(["business", "technology"])
+
     def __init__(self, rate_cache, logger):
         super().__init__(rate_cache, logger)
         self.api_key = os.getenv("NEWSDATA_KEY")
@@ -125,13 +146,6 @@ class NewsDataClient(NewsClientBase):
         if self.rate_cache is not None and is_rate_limited(self.rate_cache, "NewsData"):
             return []
 
-        categories = [
-            "business",
-            "technology",
-        ]
-        categories_str = ",".join(categories)
-        
-        url = "https://newsdata.io/api/1/news"
         keyword = ticker_name
         if ticker_name == "" or ticker_name is None:
             keyword = ticker
@@ -140,28 +154,28 @@ class NewsDataClient(NewsClientBase):
             "apikey": self.api_key,
             "q": f'"{keyword}"',  # safely quoted
             "language": "en",
-            "category": categories_str,
+            "category": self.CATEGORIES,
 
         }
         try:
-            resp = requests.get(url, params=params)
+            resp = _SESSION.get(self.URL, params=params, timeout=HTTP_TIMEOUT)
             if resp.status_code == 429:
                 self.logger.logMessage("[NewsData] Rate limited (429)")
                 if self.rate_cache is not None:
                     self.rate_cache.add("NewsData", 3600)
                 return None
             resp.raise_for_status()
-            items = resp.json().get("results", []) or []
-            out = []
-            for it in items:
-                out.append(Headline(
+            items = newsdata_decoder.decode(resp.content).results or []
+            return [
+                Headline(
                     source="newsdata",
-                    title=it.get("title") or "",
-                    description=it.get("description"),
-                    url=it.get("link"),
-                    published_at=it.get("pubDate") or it.get("date")
-                ))
-            return out
+                    title=it.title or "",
+                    description=it.description,
+                    url=it.link,
+                    published_at=it.pubDate or it.date
+                )
+                for it in items
+            ]
         except Exception as e:
             self.logger.logMessage(f"[NewsData] fetch error: {e}")
             return []
@@ -175,22 +189,47 @@ class GoogleNewsClient(NewsClientBase):
         query = "+OR+".join([k.replace(" ", "+") for k in keywords if k])
         return f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
 
+    @staticmethod
+    def _parse_rss(content: bytes) -> List[Headline]:
+        # Google News serves fixed-schema RSS 2.0, so the C ElementTree parser reads it
+        # directly instead of going through feedparser's sniffing and sanitising
+        root = ElementTree.fromstring(content)
+        return [
+            Headline(
+                source="google",
+                title=item.findtext("title") or "",
+                description=clean_description(item.findtext("description")),
+                url=item.findtext("link"),
+                published_at=item.findtext("pubDate")
+            )
+            for item in root.iterfind("channel/item")
+        ]
+
+    @staticmethod
+    def _parse_feed(feed) -> List[Headline]:
+        return [
+            Headline(
+                source="google",
+                title=entry.title,
+                description=clean_description(getattr(entry, "summary", None)),
+                url=getattr(entry, "link", None),
+                published_at=getattr(entry, "published", None) or getattr(entry, "updated", None)
+            )
+            for entry in feed.entries
+        ]
+
     def fetch(self, ticker: str, ticker_name: str) -> Optional[List[Headline]]:
         query = ticker_name or ticker
         keywords = [query, "stock", "finance"]
         url = self._build_query_url(keywords)
         try:
-            feed = feedparser.parse(url)
-            out = []
-            for entry in feed.entries:
-                out.append(Headline(
-                    source="google",
-                    title=entry.title,
-                    description=clean_description(getattr(entry, "summary", None)),
-                    url=getattr(entry, "link", None),
-                    published_at=getattr(entry, "published", None) or getattr(entry, "updated", None)
-                ))
-            return out
+            resp = _SESSION.get(url, timeout=HTTP_TIMEOUT)
+            resp.raise_for_status()
+            try:
+                return self._parse_rss(resp.content)
+            except ElementTree.ParseError:
+                # Not the plain RSS 2.0 we expect; let feedparser cope with it
+                return self._parse_feed(feedparser.parse(resp.content))
         except Exception as e:
             self.logger.logMessage(f"[GoogleNews] fetch error: {e}")
             return []
@@ -199,33 +238,74 @@ class GoogleNewsClient(NewsClientBase):
 # -------------------------------------------------------
 # Aggregator public function
 # -------------------------------------------------------
+# Clients are stateless apart from the rate cache and API keys, so build them once per rate cache.
+# The cache object is kept in the entry so a recycled id() never hands back clients bound to a dead one.
+_clients_by_cache: dict = {}
+
+
+def _get_clients(rate_cache: Optional[RateLimitCache]):
+    entry = _clients_by_cache.get(id(rate_cache))
+    if entry is None or entry[0] is not rate_cache:
+        entry = (rate_cache, [
+            ("newsapi", NewsAPIClient(rate_cache, logger)),
+            ("newsdata", NewsDataClient(rate_cache, logger)),
+            ("google", GoogleNewsClient(rate_cache, logger)),
+        ])
+        _clients_by_cache[id(rate_cache)] = entry
+    return entry[1]
+
+
 def aggregate_headlines_smart(ticker: str, ticker_name: str, rate_cache: RateLimitCache = None) -> List[Headline]:
     """
     Aggregate headlines from prioritized sources.
     - Returns [] on failure or no articles.
     - Returns None only when a source indicates rate-limited (so caller can respect).
     """
-    clients = [
-        ("newsapi", NewsAPIClient(rate_cache, logger)),
-        ("newsdata", NewsDataClient(rate_cache, logger)),
-        ("google", GoogleNewsClient(rate_cache, logger)),
-    ]
+    clients = _get_clients(rate_cache)
 
-    aggregated: List[Headline] = []
-    for name, client in clients:
+    def fetch(name, client):
         try:
-            items = client.fetch(ticker, ticker_name)
+            return client.fetch(ticker, ticker_name)
         except Exception as e:
             logger.logMessage(f"[Aggregator] {name} fetch exception: {e}")
-            items = []
-        if items is None:
-            # upstream rate-limited; stop and return None so caller can back off
-            logger.logMessage(f"[Aggregator] {name} returned None (rate-limited); aborting further source calls")
-            return None
-        if items:
-            aggregated.extend(items)
+            return []
 
-    return aggregated
+    # The sources are independent network calls; run them together so latency is max() rather than sum()
+    aggregated: List[Headline] = []
+    pool = ThreadPoolExecutor(max_workers=len(clients), thread_name_prefix="NewsFetch")
+    try:
+        futures = [(name, pool.submit(fetch, name, client)) for name, client in clients]
+        # Collect in priority order so the aggregate stays deterministic
+        for name, future in futures:
+            items = future.result()
+            if items is None:
+                # upstream rate-limited; stop and return None so caller can back off
+                logger.logMessage(f"[Aggregator] {name} returned None (rate-limited); discarding other sources")
+                return None
+            if items:
+                aggregated.extend(items)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return _dedupe_headlines(aggregated)
+
+
+def _dedupe_headlines(headlines: List[Headline]) -> List[Headline]:
+    """
+    Collapse the same story reported by several sources, keeping the highest-weighted source.
+    Stories are matched on their lowercased, whitespace-collapsed title (first 80 chars), or on
+    the URL when the title is empty; headlines with neither are all kept.
+    """
+    default_w = SOURCE_WEIGHTS["default"]
+    seen = {}
+    for h in headlines:
+        sig = " ".join((h.title or "").lower().split())[:80]
+        if not sig:
+            sig = ("url", h.url) if h.url else ("id", id(h))
+        prev = seen.get(sig)
+        if prev is None or SOURCE_WEIGHTS.get(h.source, default_w) > SOURCE_WEIGHTS.get(prev.source, default_w):
+            seen[sig] = h
+    return list(seen.values())
 
 
 # -------------------------------------------------------
@@ -245,10 +325,83 @@ SOURCE_WEIGHTS = {
     "business-insider": 0.9, "yahoo-news": 0.8, "google": 0.9, "default": 1.0
 }
 
+POSITIVE_WORDS = ("up", "gain", "beat", "rise", "surge", "rally")
+NEGATIVE_WORDS = ("down", "miss", "loss", "drop", "decline", "slump")
+
+
+def _compile_scorer(name: str, weights) -> "Callable[[str], float]":
+    """
+    Generate a straight-line scorer for a fixed word -> weight table:
+        def name(text): s = 0.0; if 'earnings' in text: s += 0.18; ...; return s
+    Each word is a constant substring test, with no dict iteration or hashing per headline.
+    Matches the plain `word in text` semantics: each word counts once, "beat" hits "beats".
+    """
+    lines = [f"def {name}(text):", "    s = 0.0"]
+    lines += [f"    if {word!r} in text: s += {float(w)!r}" for word, w in weights]
+    lines.append("    return s")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace[name]
+
+
+# Built once from the tables above; rebuild if the tables are changed at runtime
+_keyword_score = _compile_scorer("_keyword_score", KEYWORD_WEIGHTS.items())
+_positive_hits = _compile_scorer("_positive_hits", ((w, 1) for w in POSITIVE_WORDS))
+_negative_hits = _compile_scorer("_negative_hits", ((w, 1) for w in NEGATIVE_WORDS))
+
 # Optional transformer support — disable by default to avoid heavy deps
 USE_TRANSFORMERS = os.getenv("USE_TRANSFORMERS", "false").lower() == "true"
 _transformer_pipeline = None
 
+# Signed transformer score per headline text, shared across tickers: wire services and
+# Google News republish the same story, so most texts recur within a scan.
+TRANSFORMER_SCORE_MAXSIZE = 8192
+TRANSFORMER_BATCH_SIZE = 32
+TRANSFORMER_MAX_TOKENS = 128
+_score_memo: "OrderedDict[bytes, float]" = OrderedDict()
+_score_memo_lock = threading.Lock()
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.sha1(text.strip().encode("utf-8")).digest()
+
+
+def _signed_score(result) -> float:
+    label = result.get("label", "").upper()
+    score = float(result.get("score", 0.0))
+    if label == "POSITIVE":
+        return score
+    if label == "NEGATIVE":
+        return -score
+    return 0.0
+
+
+def _score_texts(pipeline, texts: List[str]) -> List[float]:
+    """Score texts with the transformer, running the model only on texts not seen before."""
+    keys = [_text_key(t) for t in texts]
+    with _score_memo_lock:
+        known = {k: _score_memo[k] for k in keys if k in _score_memo}
+        for k in known:
+            _score_memo.move_to_end(k)
+
+    pending = {}
+    for k, t in zip(keys, texts):
+        if k not in known and k not in pending:
+            pending[k] = t
+    if pending:
+        # Texts are capped at 400 chars, so 128 tokens covers them; fixed-size padded batches
+        # give one forward pass per 32 headlines instead of one per headline
+        results = pipeline(list(pending.values()), batch_size=TRANSFORMER_BATCH_SIZE,
+                           truncation=True, padding=True, max_length=TRANSFORMER_MAX_TOKENS)
+        fresh = {k: _signed_score(r) for k, r in zip(pending, results)}
+        with _score_memo_lock:
+            _score_memo.update(fresh)
+            while len(_score_memo) > TRANSFORMER_SCORE_MAXSIZE:
+                _score_memo.popitem(last=False)
+        known.update(fresh)
+
+    return [known[k] for k in keys]
+
 
 def _load_transformer_pipeline():
     global _transformer_pipeline
@@ -262,6 +415,13 @@ def _load_transformer_pipeline():
         if tok.pad_token is None:
             tok.pad_token = tok.eos_token
         model = transformers.AutoModelForSequenceClassification.from_pretrained(model_name)
+        try:
+            # int8 dynamic quantization of the Linear layers: they dominate BERT inference cost on CPU
+            import torch
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        except Exception as e:
+            logger.logMessage(f"[Sentiment] Quantization skipped, using fp32 model: {e}")
+        model.eval()
         _transformer_pipeline = transformers.pipeline("sentiment-analysis", model=model, tokenizer=tok)
         logger.logMessage("[Sentiment] Transformer pipeline loaded")
     except Exception as e:
@@ -270,6 +430,28 @@ def _load_transformer_pipeline():
     return _transformer_pipeline
 
 
+@lru_cache(maxsize=4096)
+def _published_ts(raw: str) -> Optional[float]:
+    """
+    Epoch seconds for a headline's published date, or None if it can't be aged.
+    NewsAPI sends ISO-8601, Google News RSS sends RFC-822; naive timestamps are ignored.
+    """
+    pub = None
+    if raw[:4].isdigit():
+        try:
+            pub = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    else:
+        try:
+            pub = parsedate_to_datetime(raw)
+        except (TypeError, ValueError):
+            pass
+    if pub is None or pub.tzinfo is None:
+        return None
+    return pub.timestamp()
+
+
 def compute_headlines_sentiment(headlines: List[Headline]) -> float:
     """
     Compute a sentiment score in [-1.0, 1.0] for a list of Headline objects.
@@ -281,26 +463,17 @@ def compute_headlines_sentiment(headlines: List[Headline]) -> float:
         if not headlines:
             return 0.0
 
-        texts = [h.combined_text()[:400] for h in headlines]
+        combined_texts = [h.combined_text() for h in headlines]
+        texts = [t[:400] for t in combined_texts]
 
         # Transformer path (yields roughly -1..1 via mapping)
         if USE_TRANSFORMERS:
             pipeline = _load_transformer_pipeline()
             if pipeline:
                 try:
-                    results = pipeline(texts, truncation=True)
-                    vals = []
-                    for r in results:
-                        label = r.get("label", "").upper()
-                        score = float(r.get("score", 0.0))
-                        if label == "POSITIVE":
-                            vals.append(score)
-                        elif label == "NEGATIVE":
-                            vals.append(-score)
-                        else:
-                            vals.append(0.0)
+                    vals = _score_texts(pipeline, texts)
                     if vals:
-                        mean = sum(vals) / len(vals)
+                        mean = math.fsum(vals) / len(vals)
                         # ensure range [-1,1]
                         return float(max(-1.0, min(1.0, mean)))
                 except Exception as e:
@@ -309,45 +482,44 @@ def compute_headlines_sentiment(headlines: List[Headline]) -> float:
         # Fallback heuristic: keyword + source weight + recency weight
         weighted_scores = []
         total_weight = 0.0
-        for h in headlines:
-            text = h.combined_text().lower()
-            kw_score = 0.0
-            for kw, w in KEYWORD_WEIGHTS.items():
-                if kw in text:
-                    kw_score += w
+        neutral_count = 0  # headlines that can only contribute 0 to the average
+        source_weight, default_sw = SOURCE_WEIGHTS.get, SOURCE_WEIGHTS["default"]
+        now_ts = time.time()
+        for h, text in zip(headlines, map(str.lower, combined_texts)):
+            # each keyword counts once, however often it appears
+            kw_score = _keyword_score(text)
 
             # lightweight lexical polarity fallback
-            pos_hits = sum(1 for w in ("up", "gain", "beat", "rise", "surge", "rally") if w in text)
-            neg_hits = sum(1 for w in ("down", "miss", "loss", "drop", "decline", "slump") if w in text)
+            pos_hits = _positive_hits(text)
+            neg_hits = _negative_hits(text)
             lex_score = 0.05 * (pos_hits - neg_hits)
+            raw_score = kw_score + lex_score
+            if raw_score == 0.0:
+                # Most headlines match nothing; they still count toward the mean but need
+                # no source or recency weighting
+                neutral_count += 1
+                continue
 
-            # source weight
-            src = (h.source or "").lower()
-            sw = SOURCE_WEIGHTS.get(src, SOURCE_WEIGHTS["default"])
+            # source weight; clients set source to a lowercase literal, so no normalising needed
+            sw = source_weight(h.source, default_sw)
 
             # recency weight (best-effort)
             rec_w = 1.0
-            if h.published_at:
-                try:
-                    from datetime import datetime, timezone
-                    pub = datetime.fromisoformat(h.published_at.replace("Z", "+00:00"))
-                    age_days = max(0.0, (datetime.now(timezone.utc) - pub).days)
-                    rec_w = math.exp(-age_days / 3.0)
-                except Exception:
-                    rec_w = 1.0
-
-            combined = (kw_score + lex_score) * sw * rec_w
+            pub_ts = _published_ts(h.published_at) if h.published_at else None
+            if pub_ts is not None:
+                age_days = max(0.0, (now_ts - pub_ts) // 86400)
+                rec_w = math.exp(-age_days / 3.0)
+
+            combined = raw_score * sw * rec_w
             weighted_scores.append(combined)
             total_weight += abs(sw * rec_w)
 
         if not weighted_scores or total_weight == 0:
             return 0.0
 
-        avg = sum(weighted_scores) / len(weighted_scores)
+        avg = math.fsum(weighted_scores) / (len(weighted_scores) + neutral_count)
         # clamp to [-1,1], but we expect values small so scale if needed
-        if avg > 1.0: avg = 1.0
-        if avg < -1.0: avg = -1.0
-        return float(avg)
+        return float(max(-1.0, min(1.0, avg)))
 
     except Exception as e:
         logger.logMessage(f"[Sentiment] compute_headlines_sentiment error: {e}")
@@ -357,39 +529,49 @@ def compute_headlines_sentiment(headlines: List[Headline]) -> float:
 # -------------------------------------------------------
 # Convenience: one-call sentiment getter used in scanner
 # -------------------------------------------------------
+# Repeat lookups for a ticker within a scan cycle reuse the score instead of
+# re-querying three sources and re-running the model
+SENTIMENT_MEMO_TTL = 300  # seconds
+SENTIMENT_MEMO_MAXSIZE = 4096
+_sentiment_memo = TtlMemo(SENTIMENT_MEMO_TTL, SENTIMENT_MEMO_MAXSIZE)
+
+
 def get_sentiment_signal(ticker: str, ticker_name: str = "", rate_cache: RateLimitCache = None,headline_cache: HeadlineCache = None) -> Optional[float]:
     """
     Fetch headlines and compute sentiment signal.
     Returns float in [-1,1] or None if upstream rate-limited (so caller can back off).
     """
+    key = (ticker, ticker_name)
+    cached = _sentiment_memo.get(key)
+    if cached is not None:
+        return cached
     try:
         headlines = aggregate_headlines_smart(ticker, ticker_name, rate_cache=rate_cache)
         if headlines is None:
-            # upstream told us to back off due to rate limits
+            # upstream told us to back off due to rate limits; not memoized so the next call retries
             return None
         if not headlines:
-            return 0.0
-        headline_cache.add(ticker,strip_unwanted_fields(headlines))
-        return compute_headlines_sentiment(headlines)
+            signal = 0.0
+        else:
+            headline_cache.add(ticker,strip_unwanted_fields(headlines))
+            signal = compute_headlines_sentiment(headlines)
+        _sentiment_memo.put(key, signal)
+        return signal
     except Exception as e:
         logger.logMessage(f"[Aggregator] get_sentiment_signal error for {ticker}: {e}")
         return 0.0
 
+_TAG_RE = re.compile(r"<[^>]*>")  # character class: linear scan, no lazy backtracking
+
+
 def clean_description(html_text: str) -> str:
     """Remove HTML tags, decode entities, and normalize whitespace."""
-    import re
-    from html import unescape
-
     if not html_text:
         return ""
 
-    no_tags = re.sub(r"<.*?>", "", html_text)
-    text = unescape(no_tags)
-
-    # Replace non-breaking spaces and normalize multiple spaces
-    text = text.replace("\xa0", " ")
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    # split() with no separator collapses any run of Unicode whitespace (including
+    # non-breaking spaces) and drops leading/trailing whitespace in the same pass
+    return " ".join(unescape(_TAG_RE.sub("", html_text)).split())
 
 def strip_unwanted_fields(headlines, drop_keys=None):
     drop_keys = set(drop_keys or ["url"])
@@ -399,7 +581,7 @@ def strip_unwanted_fields(headlines, drop_keys=None):
         if isinstance(h, dict):
             source = h
         else:
-            source = vars(h)  # Get object attributes
+            source = asdict(h) if is_dataclass(h) else vars(h)  # slotted Headlines have no __dict__
 
         # Keep only wanted fields
         filtered = {k: v for k, v in source.items() if k not in drop_keys}
@@ -1,18 +1,34 @@
 import time
+import orjson
+import pandas as pd
+import requests
 import yfinance as yf
 from datetime import datetime, timedelta
 from services.logging.logger_singleton import getLogger
 from services.core.cache_manager import RateLimitCache
 from services.scanner.scanner_utils import is_rate_limited, wait_rate_limit
 
+SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+SPARK_BATCH_SIZE = 20  # symbols per spark request (Yahoo's limit)
+RETRY_BACKOFF_SECONDS = 2  # pause before retrying a non-rate-limit failure
+_SPARK_HEADERS = {"User-Agent": "Mozilla/5.0"}  # Yahoo rejects the default python-requests agent
+
+
 class YFTooManyAttempts(Exception):
     """Raised when too many YFinance attempts"""
     pass
 
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    # yfinance raises YFRateLimitError on newer releases; older ones surface the HTTP text
+    return type(e).__name__ == "YFRateLimitError" or "Too Many Requests" in str(e) or "429" in str(e)
+
+
 class YFinanceFetcher:
     def __init__(self, rate_cache: RateLimitCache, default_cooldown_seconds=60):
         self.rate_cache = rate_cache
-        self.default_cooldown = default_cooldown_seconds  # fallback cooldown
+        self.default_cooldown = default_cooldown_seconds  # cooldown recorded when Yahoo rate-limits us
+        self.bucket = rate_cache.bucket("YFinance")  # shared by every fetcher in the process
         self.logger = getLogger()
 
     def _update_cooldown(self, wait_seconds: int):
@@ -20,29 +36,84 @@ class YFinanceFetcher:
         self.rate_cache.add("YFinance", wait_seconds)
 
     def fetch_ticker(self, ticker: str, max_retries=5) -> dict:
-        """Fetch a yfinance Ticker object with caching and rate-limit handling."""
+        """Fetch a yfinance Ticker's info, paced by the shared YFinance token bucket."""
         retries = 0
         while retries < max_retries:
             if is_rate_limited(self.rate_cache, "YFinance"):
                 wait_rate_limit(self.rate_cache, "YFinance")
+            self.bucket.acquire()
 
             try:
-                obj = yf.Ticker(ticker)
-                # Minimal call to trigger possible rate-limit errors
-                info = obj.info  
-
-                # Success: clear rate cache under lock
-                with self.rate_cache._lock:
-                    if "YFinance" in self.rate_cache._cache:
-                        del self.rate_cache._cache["YFinance"]
-                return info
-
+                return yf.Ticker(ticker).info
             except Exception as e:
                 retries += 1
                 self.logger.logMessage(f"[yFinance] Error fetching {ticker}: {e}. Retry {retries}/{max_retries}")
-                # Exponential backoff, capped at 30 mins
-                wait_time = min(self.default_cooldown * (3 ** retries), 1800)
-                self._update_cooldown(wait_time)
-                time.sleep(wait_time)
+                if _is_rate_limit_error(e):
+                    # Pushed back despite pacing: empty the bucket so every thread waits on the refill,
+                    # and hold off for one cooldown rather than an escalating sleep
+                    self.bucket.drain()
+                    self._update_cooldown(self.default_cooldown)
+                elif retries < max_retries:
+                    # Not a rate limit, so no cooldown; a short fixed pause keeps a failing symbol
+                    # from spending all its tokens in a burst
+                    time.sleep(RETRY_BACKOFF_SECONDS)
 
         raise YFTooManyAttempts(f"Failed to fetch ticker {ticker} after {max_retries} retries.")
+
+    def fetch_history_batch(self, tickers, range_: str = "2mo", interval: str = "1d", stop_event=None) -> dict:
+        """
+        Daily close history for many symbols, SPARK_BATCH_SIZE symbols per request.
+        Returns {symbol: DataFrame with a "Close" column}, shaped like yf.Ticker(...).history()
+        for the columns the strategies read. Symbols Yahoo has no data for are omitted; on a
+        rate limit or once stop_event is set, whatever was fetched so far is returned.
+        Spark closes are unadjusted, unlike history()'s default auto_adjust=True: a split or
+        dividend inside the window shows up as a price step rather than being smoothed out.
+        """
+        out = {}
+        tickers = list(tickers)
+        with requests.Session() as session:
+            for i in range(0, len(tickers), SPARK_BATCH_SIZE):
+                if stop_event is not None and stop_event.is_set():
+                    break
+                if is_rate_limited(self.rate_cache, "YFinance"):
+                    break
+                chunk = tickers[i:i + SPARK_BATCH_SIZE]
+                params = {"symbols": ",".join(chunk), "range": range_, "interval": interval}
+                self.bucket.acquire()
+                try:
+                    resp = session.get(SPARK_URL, params=params, headers=_SPARK_HEADERS, timeout=(3, 10))
+                    if resp.status_code == 429:
+                        self.logger.logMessage("[yFinance] Spark rate limited (429); stopping batch history fetch")
+                        self.bucket.drain()
+                        self._update_cooldown(self.default_cooldown)
+                        break
+                    resp.raise_for_status()
+                    out.update(self._parse_spark(orjson.loads(resp.content)))
+                except Exception as e:
+                    self.logger.logMessage(f"[yFinance] Spark fetch failed for {chunk[0]}..{chunk[-1]}: {e}")
+        return out
+
+    @staticmethod
+    def _parse_spark(payload: dict) -> dict:
+        # Older responses wrap results as spark.result[].response[]; newer ones key by symbol
+        if "spark" in payload:
+            series = (
+                (r.get("symbol"), (r.get("response") or [{}])[0])
+                for r in (payload["spark"].get("result") or [])
+            )
+        else:
+            series = payload.items()
+
+        out = {}
+        for symbol, data in series:
+            if not symbol or not data:
+                continue
+            timestamps = data.get("timestamp") or []
+            closes = data.get("close")
+            if closes is None:
+                closes = ((data.get("indicators") or {}).get("quote") or [{}])[0].get("close") or []
+            if not timestamps or len(timestamps) != len(closes):
+                continue
+            index = pd.to_datetime(timestamps, unit="s", utc=True)
+            out[symbol] = pd.DataFrame({"Close": closes}, index=index, dtype=float).dropna()
+        return out
@@ -1,4 +1,5 @@
 #buy_loop.py
+from bisect import bisect_left
 from datetime import datetime, timedelta, time as dt_time
 from services.logging.logger_singleton import getLogger
 from services.scanner.buy_scanner import run_buy_scan
@@ -17,6 +18,35 @@ DEFAULT_COOLDOWN_SECONDS = 60  # 60 seconds, give the scanner enoung time to dro
 token_status = TokenStatus()
 us_holidays = holidays.US(subdiv='NYSE')
 
+# Upcoming trading dates (weekdays that aren't NYSE holidays), rebuilt once half have passed,
+# so each wake-up is a bisect instead of a walk through the holiday calendar
+TRADING_CALENDAR_DAYS = 30
+_trading_days = []
+
+
+def _upcoming_trading_days(today):
+    global _trading_days
+    if not _trading_days or _trading_days[0] > today or bisect_left(_trading_days, today) > len(_trading_days) // 2:
+        _trading_days = [
+            d for d in (today + timedelta(days=i) for i in range(TRADING_CALENDAR_DAYS))
+            if d.weekday() < 5 and d not in us_holidays
+        ]
+    return _trading_days
+
+
+def _is_trading_day(day) -> bool:
+    days = _upcoming_trading_days(day)
+    i = bisect_left(days, day)
+    return i < len(days) and days[i] == day
+
+
+def _next_market_open(now_dt, start_time) -> datetime:
+    # Today if we're still before the start time, otherwise the next trading day after today
+    first = now_dt.date() if now_dt.time() < start_time else now_dt.date() + timedelta(days=1)
+    days = _upcoming_trading_days(now_dt.date())
+    return datetime.combine(days[bisect_left(days, first)], start_time)
+
+
 _running = False 
 def buy_loop(**kwargs):
     stop_event = kwargs.get("stop_event")
@@ -41,10 +71,10 @@ def buy_loop(**kwargs):
             cooldown   = kwargs.get("cooldown_seconds") or DEFAULT_COOLDOWN_SECONDS
             force_first_run = kwargs.get("force_first_run") or False
 
-            now = datetime.now().time()
+            now_dt = datetime.now()
+            now = now_dt.time()
             if (
-                now_dt.weekday() < 5                             # Mon–Fri
-                and now_dt.date() not in us_holidays             # Not a holiday
+                _is_trading_day(now_dt.date())                   # Mon–Fri, not a holiday
                 and (start_time <= now <= end_time or force_first_run)  # During market hours or first run
             ):                
                 try:
@@ -66,19 +96,7 @@ def buy_loop(**kwargs):
 
             else:
                 now_dt = datetime.now()
-                today_start = datetime.combine(now_dt.date(), start_time)
-
-                # Figure out next possible start time
-                if now_dt.time() < start_time:
-                    # Before market opens today — try today
-                    next_start = today_start
-                else:
-                    # After market closes — try tomorrow
-                    next_start = today_start + timedelta(days=1)
-
-                # Skip weekends and holidays
-                while next_start.weekday() >= 5 or next_start.date() in us_holidays:
-                    next_start += timedelta(days=1)
+                next_start = _next_market_open(now_dt, start_time)
 
                 # Compute wait time
                 seconds_until_start = (next_start - now_dt).total_seconds()
@@ -3,12 +3,13 @@ import threading
 import queue
 from datetime import datetime, timezone
 from dataclasses import dataclass
+from types import SimpleNamespace
 from services.logging.logger_singleton import getLogger
 from services.scanner.scanner_utils import get_active_tickers
 from services.alerts import send_alert
 from strategy.buy import OptionBuyStrategy
 from services.token_status import TokenStatus
-from services.scanner.YFinanceFetcher import YFTooManyAttempts
+from services.scanner.YFinanceFetcher import YFinanceFetcher, YFTooManyAttempts, SPARK_BATCH_SIZE
 from services.etrade_consumer import TokenExpiredError, NoOptionsError, NoExpiryError, InvalidSymbolError
 from services.core.cache_manager import (
     LastTickerCache,
@@ -17,7 +18,6 @@ from services.core.cache_manager import (
     EvalCache,
     TickerMetadata,
     TickerCache,
-    RateLimitCache
 )
 from services.utils import is_json, write_scratch, get_job_count
 import json
@@ -39,7 +39,6 @@ class TickerResult:
 
 # ------------------------- Globals -------------------------
 counter_lock = threading.Lock()
-api_worker_lock = threading.Lock()
 total_tickers = 0
 remaining_ticker_count = 0
 processed_counter = 0
@@ -51,10 +50,9 @@ print("[Buy Scanner] Module loaded/reloaded")  # hot reload indicator
 
 
 def _reset_globals():
-    global counter_lock, api_worker_lock
+    global counter_lock
     global total_tickers, remaining_ticker_count, processed_counter, processed_counter_opts, total_iterated
     counter_lock = threading.Lock()
-    api_worker_lock = threading.Lock()
     total_tickers = 0
     remaining_ticker_count = 0
     processed_counter = 0
@@ -65,16 +63,103 @@ def _reset_globals():
 _reset_globals()
 
 
+def _count_iterated():
+    # Incremented from both fetch and analysis threads; += on a global is not atomic across threads
+    global total_iterated
+    with counter_lock:
+        total_iterated += 1
+
+
+class PriceHistoryPrefetch:
+    """
+    Run-scoped daily closes for tickers whose option chain came back.
+    Fetch workers register those tickers; the first analysis lookup that misses pulls itself and up to
+    SPARK_BATCH_SIZE - 1 other registered tickers in one spark request. Entries are dropped once analyzed.
+    """
+
+    def __init__(self, fetcher: YFinanceFetcher, stop_event=None):
+        self._fetcher = fetcher
+        self._stop_event = stop_event
+        self._pending = {}     # registered, not yet fetched; a dict keeps registration order
+        self._in_flight = {}   # ticker -> Event set once its batch is published
+        self._histories = {}   # fetched; None when Yahoo had nothing, so strategies fall back to yfinance
+        self._lock = threading.Lock()  # never held across the spark request
+
+    def register(self, ticker):
+        with self._lock:
+            self._pending[ticker] = None
+
+    def get(self, ticker):
+        with self._lock:
+            if ticker in self._histories:
+                return self._histories[ticker]
+            done = self._in_flight.get(ticker)
+            if done is None:
+                # Claim this ticker plus the next registered ones; other threads missing on any of
+                # them wait on this batch, and misses outside it start their own request
+                self._pending.pop(ticker, None)
+                chunk = [ticker] + [t for t, _ in zip(self._pending, range(SPARK_BATCH_SIZE - 1))]
+                done = threading.Event()
+                for t in chunk:
+                    self._pending.pop(t, None)
+                    self._in_flight[t] = done
+            else:
+                chunk = None
+
+        if chunk is None:
+            done.wait()
+            with self._lock:
+                return self._histories.get(ticker)
+
+        try:
+            fetched = self._fetcher.fetch_history_batch(chunk, stop_event=self._stop_event)
+        except Exception as e:
+            logger.logMessage(f"[Buy Scanner] Price history prefetch failed: {e}")
+            fetched = {}
+        with self._lock:
+            for t in chunk:
+                # A ticker discarded while its batch was in flight is not stored
+                if self._in_flight.pop(t, None) is not None:
+                    self._histories[t] = fetched.get(t)
+        done.set()
+        return fetched.get(ticker)
+
+    def discard(self, ticker):
+        with self._lock:
+            self._histories.pop(ticker, None)
+            self._pending.pop(ticker, None)
+            self._in_flight.pop(ticker, None)
+
+
 # ------------------------- Analysis logic -------------------------
-def analyze_ticker(ticker, options, context, buy_strategy, caches, config, debug=False):
+def resolve_caches(caches) -> SimpleNamespace:
+    """
+    Look up the caches analyze_ticker needs once per scan, building a fallback only where one is missing.
+    Each fallback CacheManager reads its file from disk, so this must not happen once per ticker.
+    """
+    return SimpleNamespace(
+        last_seen=getattr(caches, "last_seen", None) or LastTickerCache(),
+        eval=getattr(caches, "eval", None) or EvalCache(),
+        ticker=getattr(caches, "ticker", None) or TickerCache(),
+        ticker_metadata=getattr(caches, "ticker_metadata", None) or TickerMetadata(),
+        rate=getattr(caches, "rate", None),
+        news=getattr(caches, "news", None),
+        headlines=getattr(caches, "headlines", None),
+    )
+
+
+def analyze_ticker(ticker, options, context, buy_strategy, caches, config, debug=False, resolved=None):
     logger = getLogger()
     eval_result, metadata, buy_alerts = {}, {}, []
 
-    last_ticker_cache = getattr(caches, "last_seen", None) or LastTickerCache()
-    eval_cache = getattr(caches, "eval", None) or EvalCache()
-    ticker_cache = getattr(caches, "ticker", None) or TickerCache()
-    ticker_metadata_cache = getattr(caches, "ticker_metadata", None) or TickerMetadata()
-    rate_cache = getattr(caches, "rate", None)
+    if resolved is None:
+        resolved = resolve_caches(caches)
+    last_ticker_cache = resolved.last_seen
+    eval_cache = resolved.eval
+    ticker_cache = resolved.ticker
+    ticker_metadata_cache = resolved.ticker_metadata
+    rate_cache = resolved.rate
+    evaluated = getattr(resolved, "evaluated", None)  # run's eval-key snapshot plus its own writes, if taken
 
     ticker_name = ticker_cache.get(ticker) or ""
 
@@ -84,8 +169,8 @@ def analyze_ticker(ticker, options, context, buy_strategy, caches, config, debug
     sentiment_signal = None
     try:
         # If news cache exists and has cached sentiment, prefer it
-        news_cache = getattr(caches, "news", None)
-        headline_cache = getattr(caches, "headlines", None)
+        news_cache = resolved.news
+        headline_cache = resolved.headlines
         if news_cache is not None:
             try:
                 if news_cache.is_cached(ticker):
@@ -116,20 +201,37 @@ def analyze_ticker(ticker, options, context, buy_strategy, caches, config, debug
     # use a copy of context so we don't mutate caller context
     local_context = context.copy() if context else {}
     local_context["sentiment_signal"] = sentiment_signal
+    # Daily closes fetched in spark batches by run_buy_scan; strategies fall back to yfinance when None
+    price_histories = local_context.get("price_histories")
+    local_context["price_history"] = price_histories.get(ticker) if price_histories is not None else None
 
     processed_osi_keys = set()
     eval_keys = []
+    evaluated_opts = 0  # folded into processed_counter_opts once per ticker, not per option
+    # Chain metadata is gathered in the same pass as the evaluation, before any cache skip
+    min_strike = max_strike = None
+    expirations = []  # one entry per option, matching the chain order
+    pending_evals = []  # non-alerting results, written to the eval cache in one batch after the loop
 
     for opt in options:
+        strike = getattr(opt, "strikePrice", 0)
+        if min_strike is None or strike < min_strike:
+            min_strike = strike
+        if max_strike is None or strike > max_strike:
+            max_strike = strike
+        product = opt.product
+        expirations.append(f"{product.expiryYear}-{product.expiryMonth}-{product.expiryDay}")
+
         should_buy, osi_key = True, getattr(opt, "osiKey", None)
         processed_osi_keys.add(osi_key)
         disp = getattr(opt, "displaySymbol", "").split(" ")
         eval_key = f"{disp[0]} - {' '.join(disp[1:])}" if disp else str(getattr(opt, "displaySymbol", opt))
         eval_keys.append(eval_key)
 
-        # Don't reprocess if we've already processed this recently
+        # Don't reprocess if we've already processed this recently. The snapshot only rules keys out
+        # cheaply; a hit is confirmed against the cache since entries can expire during a long run
         try:
-            if eval_cache.is_cached(eval_key):
+            if (evaluated is None or eval_key in evaluated) and eval_cache.is_cached(eval_key):
                 continue
         except Exception:
             # if cache errors, proceed to evaluate anyway
@@ -158,21 +260,11 @@ def analyze_ticker(ticker, options, context, buy_strategy, caches, config, debug
             eval_result[(buy_strategy.name, buy_strategy.name, "Message")] = str(e)
             eval_result[("PrimaryStrategy", buy_strategy.name, "Score")] = "N/A"
 
-        with counter_lock:
-            global processed_counter_opts
-            processed_counter_opts += 1
-            if processed_counter_opts % 2000 == 0:
-                logger.logMessage(
-                    f"[Buy Scanner] Thread {threading.current_thread().name} | Processed {processed_counter_opts} options."
-                )
+        evaluated_opts += 1
 
         if not should_buy:
             # Save result and continue
-            if eval_cache:
-                try:
-                    eval_cache.add(eval_key, eval_result)
-                except Exception:
-                    pass
+            pending_evals.append((eval_key, eval_result))
             continue
 
         # If strategy passed (True), create alert and store result
@@ -193,14 +285,30 @@ def analyze_ticker(ticker, options, context, buy_strategy, caches, config, debug
             except Exception as e:
                 logger.logMessage(f"[Buy Scanner] send_alert failed: {e}")
 
-        if eval_cache:
-            try:
-                eval_cache.add(eval_key, eval_result)
-            except Exception:
-                pass
+        # Stored right away, not batched: an alert sent without its eval record would repeat next run
+        try:
+            eval_cache.add(eval_key, eval_result)
+        except Exception as e:
+            logger.logMessage(f"[Buy Scanner] Failed to store evaluation for {eval_key}: {e}")
+        if evaluated is not None:
+            evaluated.add(eval_key)
+
+    if pending_evals:
+        try:
+            eval_cache.bulk_add(pending_evals)
+        except Exception as e:
+            logger.logMessage(f"[Buy Scanner] Failed to store {len(pending_evals)} evaluations for {ticker}: {e}")
+        if evaluated is not None:
+            evaluated.update(key for key, _ in pending_evals)
 
     with counter_lock:
-        global processed_counter
+        global processed_counter, processed_counter_opts
+        before = processed_counter_opts
+        processed_counter_opts += evaluated_opts
+        if before // 2000 != processed_counter_opts // 2000:
+            logger.logMessage(
+                f"[Buy Scanner] Thread {threading.current_thread().name} | Processed {processed_counter_opts} options."
+            )
         processed_counter += 1
         if processed_counter % 5 == 0 and last_ticker_cache:
             last_ticker_cache.add("lastSeen", ticker)
@@ -209,17 +317,11 @@ def analyze_ticker(ticker, options, context, buy_strategy, caches, config, debug
                 f"[Buy Scanner] Thread {threading.current_thread().name} | Processed {processed_counter} tickers. {remaining_ticker_count - total_iterated} Remaining"
             )
 
-    strikes_seen = [getattr(o, "strikePrice", 0) for o in options]
-    expirations_seen = [
-        f"{getattr(o.product, 'expiryYear')}-{getattr(o.product, 'expiryMonth')}-{getattr(o.product, 'expiryDay')}"
-        for o in options
-    ]
-
     metadata = {
         "eval_keys": eval_keys,
-        "min_strike": min(strikes_seen, default=None),
-        "max_strike": max(strikes_seen, default=None),
-        "expirations": expirations_seen,
+        "min_strike": min_strike,
+        "max_strike": max_strike,
+        "expirations": expirations,
         "seen_options": list(processed_osi_keys),
         "last_checked": datetime.now().astimezone().isoformat(),
     }
@@ -244,23 +346,22 @@ def run_buy_scan(stop_event, consumer=None, caches=None, debug=False):
     _reset_globals()
 
     # Config
-    news_cache = getattr(caches, "news", None)
-    rate_cache = getattr(caches, "rate", None)
     ticker_cache = getattr(caches, "ticker", None)
     ignore_cache = getattr(caches, "ignore", None) or IgnoreTickerCache()
     bought_cache = getattr(caches, "bought", None) or BoughtTickerCache()
-    eval_cache = getattr(caches, "eval", None) or EvalCache()
     last_ticker_cache = getattr(caches, "last_seen", None)
 
     # Build single primary strategy instance (unified)
     buy_strategy = OptionBuyStrategy()
+    resolved = resolve_caches(caches)
 
-    tickers_map = get_active_tickers(ticker_cache=ticker_cache)
-    ticker_keys = list(tickers_map)
+    ticker_keys = list(get_active_tickers(ticker_cache=ticker_cache))
     if not ticker_keys:
         logger.logMessage("[Buy Scanner] No tickers to process.")
         return
 
+    # Resume against the full universe, so a lastSeen ticker that has since been ignored or bought
+    # still marks where the previous run stopped
     start_index = 0
     last_seen = last_ticker_cache.get("lastSeen") if last_ticker_cache else None
     if last_seen and last_seen in ticker_keys:
@@ -268,33 +369,38 @@ def run_buy_scan(stop_event, consumer=None, caches=None, debug=False):
     if start_index >= len(ticker_keys) - 1:
         start_index = 0
 
-    remaining_tickers = ticker_keys[start_index:]
+    # Snapshot the exclusion sets once instead of an is_cached call per ticker
+    ignored = ignore_cache.valid_keys()
+    bought = bought_cache.valid_keys()
     filtered_tickers = []
-    ignore_skipped = bankrupt_skipped = bought_skipped = eval_skipped = 0
-
-    for ticker in remaining_tickers:
+    ignore_skipped = bankrupt_skipped = bought_skipped = 0
+    for ticker in ticker_keys[start_index:]:
         if ticker.upper().endswith("Q"):   # Q Suffix means bankrupt
             bankrupt_skipped += 1
-            continue
-        if ignore_cache.is_cached(ticker):
+        elif ticker in ignored:
             ignore_skipped += 1
-            continue
-        if bought_cache.is_cached(ticker):
+        elif ticker in bought:
             bought_skipped += 1
-            continue
-        filtered_tickers.append(ticker)
+        else:
+            filtered_tickers.append(ticker)
+
+    # Fresh eval keys at run start; analyze_ticker adds what it writes so requeued tickers see them.
+    # Options outside it skip the cache lookup and expiry test entirely
+    resolved.evaluated = resolved.eval.valid_keys()
 
     logger.logMessage(f"{bankrupt_skipped} tickers skipped due to bankruptcy")
     logger.logMessage(f"{ignore_skipped} tickers skipped based on Ignore Cache")
     logger.logMessage(f"{bought_skipped} tickers skipped based on Bought Cache")
-    logger.logMessage(f"{eval_skipped} tickers skipped based on Evaluation Cache")
 
     global total_tickers, remaining_ticker_count
     total_tickers = remaining_ticker_count = len(filtered_tickers)
 
     logger.logMessage(f"[Buy Scanner] {start_index} tickers processed earlier. {remaining_ticker_count} remaining.")
 
-    context = {"consumer": consumer}
+    # One spark request per SPARK_BATCH_SIZE tickers with options, instead of a history request per option
+    # evaluated; filled as analysis reaches them so the first ticker isn't held up by the whole universe
+    price_histories = PriceHistoryPrefetch(YFinanceFetcher(resolved.rate), stop_event) if resolved.rate is not None else None
+    context = {"consumer": consumer, "price_histories": price_histories}
     try:
         context["exposure"] = consumer.get_open_exposure()
     except TokenExpiredError:
@@ -307,16 +413,12 @@ def run_buy_scan(stop_event, consumer=None, caches=None, debug=False):
         logger.logMessage(f"[Buy Scanner] Error getting open exposure: {e}")
 
     # Threading config
-    scanner_cfg = getattr(caches, "scanner_config", {}) or {}
     num_api_threads = int(max(4, get_job_count()))
     num_analysis_threads = int(max(1, get_job_count()))
-    api_semaphore_limit = int(scanner_cfg.get("api_semaphore", 8))
 
     fetch_q, result_q = queue.Queue(), queue.Queue()
-    api_semaphore = threading.Semaphore(api_semaphore_limit)
 
     def api_worker(stop_evt, ignore_cache=None):
-        global total_iterated
         logger.logMessage(f"[Buy Scanner] API worker {threading.current_thread().name} started")
         while not stop_evt.is_set():
             try:
@@ -326,86 +428,88 @@ def run_buy_scan(stop_event, consumer=None, caches=None, debug=False):
             if ticker is None:
                 fetch_q.task_done()
                 break
-            with api_semaphore:
-                try:
-                    options = consumer.get_option_chain(ticker)
-                    result_q.put((ticker, options))
-                except TimeoutError as e:
-                    fetch_q.put(ticker)
-                except NoExpiryError as e:
-                    total_iterated+=1
-                    error = "No expiry found"
-                    if hasattr(e, "args") and len(e.args) > 0:
-                        e_data = e.args[0]
-                        if is_json(e_data):
-                            e_data = json.loads(e_data)
-                            if hasattr(e_data, "Error"):
-                                error = str(e_data["Error"])
-                            else:
-                                error = str(e_data)
+            try:
+                # No scanner-side gate: the consumer's ApiWorker bounds in-flight E*TRADE calls and paces them
+                options = consumer.get_option_chain(ticker)
+                if price_histories is not None:
+                    price_histories.register(ticker)
+                result_q.put((ticker, options))
+            except TimeoutError as e:
+                fetch_q.put(ticker)
+            except NoExpiryError as e:
+                _count_iterated()
+                error = "No expiry found"
+                if hasattr(e, "args") and len(e.args) > 0:
+                    e_data = e.args[0]
+                    if is_json(e_data):
+                        e_data = json.loads(e_data)
+                        if hasattr(e_data, "Error"):
+                            error = str(e_data["Error"])
                         else:
                             error = str(e_data)
                     else:
-                        error = str(e)
-                    if ignore_cache is not None:
-                        ignore_cache.add(ticker, error)
-                except InvalidSymbolError as e:
-                    total_iterated+=1
-                    error = "Invalid Symbol found"
-                    if hasattr(e, "args") and len(e.args) > 0:
-                        e_data = e.args[0]
-                        if is_json(e_data):
-                            e_data = json.loads(e_data)
-                            if hasattr(e_data, "Error"):
-                                error = str(e_data["Error"])
-                            else:
-                                error_obj = e_data.get("Error")
-                                if error_obj is not None:
-                                    code = error_obj.get("code")
-                                    message = error_obj.get("message")
-                                    error = f"Code {code}: {message}"
-                                else:
-                                    error = str(e_data)
+                        error = str(e_data)
+                else:
+                    error = str(e)
+                if ignore_cache is not None:
+                    ignore_cache.add(ticker, error)
+            except InvalidSymbolError as e:
+                _count_iterated()
+                error = "Invalid Symbol found"
+                if hasattr(e, "args") and len(e.args) > 0:
+                    e_data = e.args[0]
+                    if is_json(e_data):
+                        e_data = json.loads(e_data)
+                        if hasattr(e_data, "Error"):
+                            error = str(e_data["Error"])
                         else:
-                            error = str(e_data)
-                    else:
-                        error = str(e)
-                    if ignore_cache is not None:
-                        ignore_cache.add(ticker, error)
-                except NoOptionsError as e:
-                    total_iterated+=1
-                    error = "No options found"
-                    if hasattr(e, "args") and len(e.args) > 0:
-                        e_data = e.args[0]
-                        if is_json(e_data):
-                            e_data = json.loads(e_data)
-                            if hasattr(e_data, "Error"):
-                                error = str(e_data["Error"])
+                            error_obj = e_data.get("Error")
+                            if error_obj is not None:
+                                code = error_obj.get("code")
+                                message = error_obj.get("message")
+                                error = f"Code {code}: {message}"
                             else:
-                                error_obj = e_data.get("Error")
-                                if error_obj is not None:
-                                    code = error_obj.get("code")
-                                    message = error_obj.get("message")
-                                    error = f"Code {code}: {message}"
-                                else:
-                                    error = str(e_data)
+                                error = str(e_data)
+                    else:
+                        error = str(e_data)
+                else:
+                    error = str(e)
+                if ignore_cache is not None:
+                    ignore_cache.add(ticker, error)
+            except NoOptionsError as e:
+                _count_iterated()
+                error = "No options found"
+                if hasattr(e, "args") and len(e.args) > 0:
+                    e_data = e.args[0]
+                    if is_json(e_data):
+                        e_data = json.loads(e_data)
+                        if hasattr(e_data, "Error"):
+                            error = str(e_data["Error"])
                         else:
-                            error = str(e_data)
+                            error_obj = e_data.get("Error")
+                            if error_obj is not None:
+                                code = error_obj.get("code")
+                                message = error_obj.get("message")
+                                error = f"Code {code}: {message}"
+                            else:
+                                error = str(e_data)
                     else:
-                        error = str(e)
-                    if ignore_cache is not None:
-                        ignore_cache.add(ticker, error)
-                except TokenExpiredError as e:
-                    logger.logMessage("[Buy Scanner] TokenExpiredError in api_worker.")
-                    send_alert("E*TRADE token expired. Please re-authenticate.")
-                    token_status.wait_until_valid(check_interval=30)
-                    consumer.load_tokens(generate_new_token=False)
-                    fetch_q.put(ticker)
-                except Exception as e:
-                    logger.logMessage(f"[Buy Scanner] Error fetching options for {ticker}: {e}")
-                    result_q.put((ticker, None))
-                finally:
-                    fetch_q.task_done()
+                        error = str(e_data)
+                else:
+                    error = str(e)
+                if ignore_cache is not None:
+                    ignore_cache.add(ticker, error)
+            except TokenExpiredError as e:
+                logger.logMessage("[Buy Scanner] TokenExpiredError in api_worker.")
+                send_alert("E*TRADE token expired. Please re-authenticate.")
+                token_status.wait_until_valid(check_interval=30)
+                consumer.load_tokens(generate_new_token=False)
+                fetch_q.put(ticker)
+            except Exception as e:
+                logger.logMessage(f"[Buy Scanner] Error fetching options for {ticker}: {e}")
+                result_q.put((ticker, None))
+            finally:
+                fetch_q.task_done()
         logger.logMessage(f"[Buy Scanner] API worker {threading.current_thread().name} exiting")
 
     def analysis_worker(stop_evt):
@@ -419,15 +523,18 @@ def run_buy_scan(stop_event, consumer=None, caches=None, debug=False):
                 result_q.task_done()
                 break
             ticker, options = item
-            global total_iterated
-            total_iterated += 1
+            _count_iterated()
             if options is not None:
                 try:
-                    analyze_ticker(ticker, options, context, buy_strategy, caches, {}, debug)
+                    analyze_ticker(ticker, options, context, buy_strategy, caches, {}, debug, resolved=resolved)
+                    if price_histories is not None:
+                        price_histories.discard(ticker)
                 except YFTooManyAttempts as e:
-                    fetch_q.put(ticker)
+                    fetch_q.put(ticker)  # keep its history for the retry
                 except Exception as e:
                     logger.logMessage(f"[Buy Scanner] analyze_ticker {ticker} error: {e}")
+                    if price_histories is not None:
+                        price_histories.discard(ticker)
             else:
                 logger.logMessage(f"Ticker {ticker} has no options found but was not caught as an exception")
                 write_scratch(f"Ticker {ticker} has no options found but was not caught as an exception")
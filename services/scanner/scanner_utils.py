@@ -26,7 +26,9 @@ def get_active_tickers(ticker_cache:TickerCache = None):
         if ticker_cache.is_empty():
             tickers = fetch_us_tickers_from_finnhub(ticker_cache=ticker_cache)
         else:
-            tickers = ticker_cache._cache.keys()
+            # Copy under the lock; a live keys() view breaks if another thread adds a ticker mid-iteration
+            with ticker_cache._lock:
+                tickers = list(ticker_cache._cache)
     else:
         tickers = fetch_us_tickers_from_finnhub(ticker_cache=ticker_cache)
     return tickers
@@ -76,14 +78,13 @@ def is_rate_limited(cache: RateLimitCache, key: str) -> bool:
     if not item:
         return False  # not cached at all
 
-    reset_seconds = item.get("Value")
-    timestamp = item.get("Timestamp")
+    reset_seconds, timestamp = item
 
     if reset_seconds is None or timestamp is None:
         return False  # malformed entry, treat as expired
 
-    reset_time = timestamp + timedelta(seconds=reset_seconds)
-    if datetime.now().astimezone() >= reset_time:
+    reset_time = timestamp + reset_seconds
+    if pyTime.time() >= reset_time:
         # expired, remove from cache
         with cache._lock:
             del cache._cache[key]
@@ -102,18 +103,13 @@ def wait_rate_limit(cache: RateLimitCache, key: str):
     if not item:
         return  # no limit, proceed
 
-    reset_seconds = item.get("Value")
-    timestamp = item.get("Timestamp")
+    reset_seconds, timestamp = item
 
     if reset_seconds is None or timestamp is None:
         return  # malformed entry, treat as expired
 
-    # Ensure timestamp is a datetime object
-    if isinstance(timestamp, str):
-        timestamp = datetime.fromisoformat(timestamp)
-
-    reset_time = timestamp + timedelta(seconds=reset_seconds)
-    now = datetime.now().astimezone()
+    reset_time = timestamp + reset_seconds
+    now = pyTime.time()
 
     if now >= reset_time:
         # expired, remove from cache
@@ -122,7 +118,7 @@ def wait_rate_limit(cache: RateLimitCache, key: str):
         return
 
     # Calculate remaining wait time in seconds
-    remaining = (reset_time - now).total_seconds()
+    remaining = reset_time - now
     print(f"[RateLimit] Waiting {remaining:.1f} seconds for {key}...")
     pyTime.sleep(remaining)
 
@@ -1,10 +1,10 @@
 
-import queue
 import time
 import threading
 import enum
 from dataclasses import dataclass
 from typing import Optional, Any
+import orjson
 import requests
 import uuid
 from typing import Callable
@@ -17,71 +17,96 @@ class HttpMethod(enum.Enum):
     DELETE = "DELETE"
 
 
-@dataclass
+@dataclass(slots=True)
 class HttpResult:
     ok: bool
     status_code: Optional[int] = None
     data: Optional[Any] = None
     error: Optional[str] = None
     response: Optional[requests.Response] = None
+    error_code: Optional[int] = None  # E*TRADE Error.code parsed from a 4xx body, if present
+
+
+def _etrade_error_code(response) -> Optional[int]:
+    """Error.code from an E*TRADE error body, or None if it can't be read."""
+    try:
+        return int(orjson.loads(response.content)["Error"]["code"])
+    except Exception:
+        return None
 
 
 class ApiWorker:
     def __init__(self, consumer,stop_event, min_interval: float = 1.0, default_timeout: float = 30.0, num_workers: int = 8):
         self.consumer = consumer
-        self._queue = queue.Queue()
         self._min_interval = min_interval
         self._default_timeout = default_timeout
         self._stop_event = stop_event if stop_event is not None else threading.Event()
 
-        
-        
-        # shared rate limiter
-        self._last_call = 0.0
+        # Requests run in the caller's thread: the semaphore caps how many are in flight,
+        # and the slot clock spaces their start times min_interval apart across all callers.
+        self._concurrency = threading.Semaphore(num_workers)
+        self._next_slot = 0.0
         self._rate_lock = threading.Lock()
 
-        # worker pool
-        self._threads = []
-        for i in range(num_workers):
-            t = threading.Thread(target=self._worker, name=f"ApiWorker-{i}", kwargs={"stop_event":stop_event}, daemon=True)
-            t.start()
-            self._threads.append(t)
-
-    def _respect_rate_limit(self):
+    def _respect_rate_limit(self) -> bool:
+        """Wait for this caller's start slot. Returns False if stopped while waiting."""
         with self._rate_lock:
-            now = time.time()
-            elapsed = now - self._last_call
-            if elapsed < self._min_interval:
-                time.sleep(self._min_interval - elapsed)
-            self._last_call = time.time()
-
-
-    def call_api(self, method: HttpMethod, url: str, timeout: float = 30.0, **kwargs) -> HttpResult:
+            now = time.monotonic()
+            wait = max(0.0, self._next_slot - now)
+            self._next_slot = max(self._next_slot, now) + self._min_interval
+        if wait > 0:
+            return not self._stop_event.wait(wait)
+        return not self._stop_event.is_set()
+
+    def _stopped_result(self) -> HttpResult:
+        error="ApiWorker stopped before request completed"
+        status_code=500
+        return HttpResult(ok=False,status_code=status_code, error=error,response={"ok":False, "data":None,"status_code":status_code,"error":error})
+
+    def call_api(self, method: HttpMethod, url: str, timeout: float = None, **kwargs) -> HttpResult:
         """
-        Queue an API call and wait for result, but return early if stopped or timeout.
+        Perform a rate-limited API call in the calling thread, returning early if stopped.
         """
-        result = []
-        self._queue.put((method, url, kwargs, result))
-
-        start_time = time.time()
-        while not result:
-            if self._stop_event.is_set():
-                error="ApiWorker stopped before request completed"
-                status_code=500
-                return HttpResult(ok=False,status_code=status_code, error=error,response={"ok":False, "data":None,"status_code":status_code,"error":error})
-            if timeout is not None and (time.time() - start_time) > timeout:
-                error = f"Timeout waiting for ApiWorker while calling {url}"
+        if self._stop_event.is_set():
+            return self._stopped_result()
+
+        timeout = timeout if timeout is not None else self._default_timeout
+        with self._concurrency:
+            if not self._respect_rate_limit():
+                return self._stopped_result()
+            try:
+                if method == HttpMethod.GET:
+                    r = self.consumer.session.get(url, timeout=timeout, **kwargs)
+                elif method == HttpMethod.PUT:
+                    r = self.consumer.session.put(url, timeout=timeout, **kwargs)
+                elif method == HttpMethod.POST:
+                    r = self.consumer.session.post(url, timeout=timeout, **kwargs)
+                elif method == HttpMethod.DELETE:
+                    r = self.consumer.session.delete(url, timeout=timeout, **kwargs)
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+
+                r.raise_for_status()
+                return HttpResult(ok=True, status_code=r.status_code, response=r)
+
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else None
+                return HttpResult(
+                    ok=False,
+                    status_code=status_code,
+                    error=f"HTTPError: {str(e)}",
+                    response=e.response,
+                    error_code=_etrade_error_code(e.response) if status_code == 400 else None
+                )
+            except requests.exceptions.Timeout as e:
+                error = f"Timeout while calling {url}: {e}"
                 status_code=408
                 return HttpResult(ok=False, status_code=status_code, error=error, response={"ok":False,"data":None, "status_code":status_code,"error":error})
-            time.sleep(0.01)
-
-        return result[0]
+            except Exception as e:
+                return HttpResult(ok=False, error=f"Error: {str(e)}", status_code=500,response={"ok":False,"status_code":500,"error":str(e),"data":None})
 
     def stop(self):
         self._stop_event.set()
-        # drain queue before joining
-        for t in self._threads:
-            t.join(timeout=1)
 
 
     def call_api_async(
@@ -97,94 +122,17 @@ class ApiWorker:
         Returns a job_id you can track.
         """
         job_id = str(uuid.uuid4())
-        self._queue.put((method, url, kwargs, callback, job_id))
-        return job_id
-    
 
-    def _worker(self,stop_event):
-        # prefer stop_event arg for compatibility, otherwise use instance stop_event
-        """
-        Worker loop that handles both sync and async API calls.
-        Sync call_api pushes (method, url, kwargs, result)
-        Async call_api_async pushes (method, url, kwargs, callback, job_id)
-        """
-    
-        while not self._stop_event.is_set() or not self._queue.empty():
-            try:
-                item = self._queue.get(timeout=1)
-            except queue.Empty:
-                continue
-    
-            # Detect format: sync vs async
-            if len(item) == 5:
-                method, url, kwargs, callback, job_id = item
-                is_async = True
-            elif len(item) == 4:
-                method, url, kwargs, result = item
-                callback = None
-                job_id = None
-                is_async = False
-            else:
-                self.consumer.logger.logMessage(f"[ApiWorker] Unexpected queue item format: {item}")
-                self._queue.task_done()
-                continue
-    
-            now = time.time()
-            elapsed = now - self._last_call
-            if elapsed < self._min_interval:
-                self._stop_event.wait(self._min_interval - elapsed)
-            self._last_call = time.time()
-    
-            try:
-                timeout = kwargs.pop("timeout", self._default_timeout)
-                r = None
-                if method == HttpMethod.GET:
-                    r = self.consumer.session.get(url, timeout=timeout, **kwargs)
-                elif method == HttpMethod.PUT:
-                    r = self.consumer.session.put(url, timeout=timeout, **kwargs)
-                elif method == HttpMethod.POST:
-                    r = self.consumer.session.post(url, timeout=timeout, **kwargs)
-                elif method == HttpMethod.DELETE:
-                    r = self.consumer.session.delete(url, timeout=timeout, **kwargs)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-    
-                r.raise_for_status()
-                result_obj = HttpResult(ok=True, status_code=r.status_code, response=r)
-    
-                if is_async and callback:
-                    try:
-                        callback(result_obj, job_id)
-                    except Exception as e:
-                        self.consumer.logger.logMessage(f"[ApiWorker] Async callback error: {e}")
-                elif not is_async:
-                    result.append(result_obj)
-    
-            except requests.exceptions.HTTPError as e:
-                err_obj = HttpResult(
-                    ok=False,
-                    status_code=e.response.status_code if e.response else None,
-                    error=f"HTTPError: {str(e)}",
-                    response=e.response
-                )
-                if is_async and callback:
-                    try:
-                        callback(err_obj, job_id)
-                    except Exception as e:
-                        self.consumer.logger.logMessage(f"[ApiWorker] Async callback error: {e}")
-                elif not is_async:
-                    result.append(err_obj)
-            except Exception as e:
-                err_obj = HttpResult(ok=False, error=f"Error: {str(e)}", status_code=500,response={"ok":False,"status_code":500,"error":str(e),"data":None})
-                if is_async and callback:
-                    try:
-                        callback(err_obj, job_id)
-                    except Exception as ex:
-                        self.consumer.logger.logMessage(f"[ApiWorker] Async callback error: {ex}")
-                elif not is_async:
-                    result.append(err_obj)
-            finally:
-                self._queue.task_done()
+        def run():
+            result_obj = self.call_api(method, url, **kwargs)
+            if callback:
+                try:
+                    callback(result_obj, job_id)
+                except Exception as e:
+                    self.consumer.logger.logMessage(f"[ApiWorker] Async callback error: {e}")
+
+        threading.Thread(target=run, name=f"ApiWorker-{job_id[:8]}", daemon=True).start()
+        return job_id
     
 
 # ---------------------------
@@ -7,7 +7,6 @@ import importlib
 from pathlib import Path
 from datetime import datetime
 from services.logging.logger_singleton import getLogger
-from services.helpers import snapshot_module
 from services.utils import set_reload_flag
 from services.core.cache_manager import Caches
 
@@ -440,9 +439,12 @@ class ThreadManager:
     # Wait for shutdown
     # ---------------------------
     def wait_for_shutdown(self):
+        # Block on the stop event rather than sleeping: 'exit' and shutdown callbacks go through
+        # stop_all(), which sets it, so this returns as soon as they fire. The timeout only bounds how
+        # long a Ctrl+C can go unnoticed on Windows.
         try:
-            while not self._manager_stop_event.is_set():
-                time.sleep(0.5)
+            while not self._manager_stop_event.wait(timeout=0.5):
+                pass
         except KeyboardInterrupt:
             self._manager_stop_event.set()
             self.logger.logMessage("[ThreadManager] KeyboardInterrupt received → stopping all")
@@ -145,9 +145,10 @@ class OptionBuyStrategy(BuyStrategy):
                     else:
                         # fallback to realized volatility
                         try:
-                            ticker = option.symbol
-                            yf_t = yf.Ticker(ticker)
-                            ph = yf_t.history(period="60d")["Close"].dropna()
+                            hist = context.get("price_history") if context else None
+                            if hist is None:
+                                hist = yf.Ticker(option.symbol).history(period="60d")
+                            ph = hist["Close"].dropna()
                             if len(ph) >= 10:
                                 rv = realized_volatility_from_prices(ph.values[-30:])
                                 if rv is not None:
@@ -241,8 +242,8 @@ class OptionBuyStrategy(BuyStrategy):
 
             # Trend (EMA 8/21) + RSI
             try:
-                hist = None
-                if option.symbol:
+                hist = context.get("price_history") if context else None
+                if hist is None and option.symbol:
                     yf_t = yf.Ticker(option.symbol)
                     hist = yf_t.history(period="2mo")
                 if hist is not None and len(hist) >= 20:
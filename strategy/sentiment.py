@@ -16,6 +16,7 @@ from services.logging.logger_singleton import getLogger
 from services.scanner.YFinanceFetcher import YFinanceFetcher, YFTooManyAttempts
 import transformers
 import threading
+from datetime import date
 
 
 #### Intentionally not having as a scoring system like with buy.py
@@ -145,6 +146,9 @@ class SectorSentimentStrategy(BuyStrategy,SellStrategy):
         self._rate_cache = getattr(caches, "rate", None)
         self._yfin_cache = getattr(caches, "yfin", None)
         self.sentiment_pipeline = getSentimentPipeline()
+        # Sector ETF trend per (etf, day): every holding in a sector shares one history lookup per run
+        self._sector_trend = {}
+        self._sector_trend_lock = threading.Lock()
     
     """
     Combines buy and sell sentiment logic for options based on sector ETF trend
@@ -267,6 +271,16 @@ class SectorSentimentStrategy(BuyStrategy,SellStrategy):
     
     
     def is_sector_in_uptrend(self, etf_symbol: str) -> bool:
+        key = (etf_symbol, date.today())
+        with self._sector_trend_lock:
+            cached = self._sector_trend.get(key)
+        if cached is None:
+            cached = self._sector_trend_from_history(etf_symbol)
+            with self._sector_trend_lock:
+                self._sector_trend[key] = cached
+        return cached
+
+    def _sector_trend_from_history(self, etf_symbol: str) -> bool:
         etf = yf.Ticker(etf_symbol)
         hist = etf.history(period="1mo")
         if len(hist) < 20: